@@ -2,6 +2,7 @@ from os import path
 import pygame
 
 from Classes.Button import Button
+from Scripts.DisplayUtilities import mark_dirty
 
 
 class CheckBox(Button):
@@ -34,4 +35,5 @@ class CheckBox(Button):
             pygame.draw.rect(surface=self.window, color=self.color, rect=pygame.Rect(smaller_pos, smaller_size))
         else:  # Draw a blank square inside to show as inactive
             pygame.draw.rect(surface=self.window, color=(255, 255, 255), rect=pygame.Rect(smaller_pos, smaller_size))
+        mark_dirty(self.rect)
         return None
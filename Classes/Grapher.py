@@ -1,33 +1,35 @@
-from os import path
+from collections import OrderedDict
 from math import *
-from numpy import linspace, arange
-from time import sleep
+import numpy
+from time import perf_counter
 
 import pygame
 
 from Classes.Text import Text
-from Scripts.GraphUtilities import generate_plot_points, gamma_shift, format_equation, generate_iterative_plots
-from Scripts.NumberUtilities import d_round
+from Scripts.GraphUtilities import check_equation
+from Scripts.ImplicitUtilities import implicit_polylines
+from Scripts.VectorUtilities import graph_to_pixels, pack_polylines, polyline_strokes
+from Scripts.ExplicitUtilities import explicit_strokes
+from Scripts.NumberUtilities import d_round, nice_ticks, tick_labels
+from Scripts.TraceUtilities import span, traced
+from Scripts.DisplayUtilities import mark_dirty, font, label
 
 BG_COLOR: tuple = (240, 240, 240)
 BORDER_COLOR: tuple = (16, 16, 16)
-
-
-# Create a function dictionary to allow eval to work
-func_dict: dict = {}
-for func in ["sin", "cos", "tan", "asin", "acos", "atan", "sqrt", "log", "log10", "gamma", "gamma_shift", "fabs"]:
-    func_dict[func] = locals().get(func)
+ANIMATION_TIME: float = 0.5  # Seconds a newly drawn relation takes to be revealed
+TICK_SPACING: float = 2.5  # Least space between ticks, in label sizes
+BACKGROUND_CACHE: int = 8  # Blank graphs kept, so returning to a recent view doesn't render its labels again
 
 
 class Grapher:
     def __init__(self, window: pygame.Surface, resolution: tuple[int, int], pos: tuple[int, int],
-                 x_range: tuple[float, float], y_range: tuple[float, float]):
+                 x_range: tuple[float, float], y_range: tuple[float, float], functions: int = 4):
         self.lhs, self.rhs, self.x_tol, self.y_tol = None, None, 0, 0
         self.window: pygame.Surface = window
         self.pos: tuple[int, int] = pos
         self.resolution: tuple[int, int] = resolution
 
-        self.font: pygame.font = pygame.font.Font(path.join("Assets", "FiraCode.ttf"), min(resolution) // 60)
+        self.font: pygame.font = font(min(resolution) // 60)
         
         self.x_bounds: tuple[float, float] = x_range
         self.y_bounds: tuple[float, float] = y_range
@@ -38,8 +40,18 @@ class Grapher:
         # Holds the negative of decimal places the graph should show
         self.dec_places: tuple = floor(log10(self.range[0] * 0.25)), floor(log10(self.range[1] * 0.25))
         
-        self.graph_points: list[list] | None = [[], [], [], []]  # Holds each relation's coordinates for fast access
+        # Holds each relation's packed polylines for fast access, see pack_polylines
+        self.graph_points: list[tuple] | None = [pack_polylines([]) for _ in range(functions)]
         self.m, self.old_m, self.n, self.old_n = 0, 0, 0, 0  # Holds some value
+        self.backgrounds: OrderedDict = OrderedDict()  # (x_bounds, y_bounds, resolution): rendered blank graph
+        
+        # Each function is drawn onto its own transparent layer, composited over the blank graph
+        # Layers are only allocated once their function draws something, see layer
+        self.layers: list[pygame.Surface | None] = [None for _ in self.graph_points]
+        self.layer_keys: list[tuple | None] = [None for _ in self.graph_points]  # What each layer was drawn for
+        self.shown: list[bool] = [True for _ in self.graph_points]
+        self.reveals: list[float | None] = [None for _ in self.graph_points]  # When each layer's animation began
+        self.changed: bool = True  # If a layer changed since the graph was last composited
         
         # Graph background
         self.clear_graph()
@@ -49,9 +61,12 @@ class Grapher:
         """
         Clears the graph and applies new resolution and boundary settings
         """
+        if resolution != self.resolution:
+            self.layers = [None for _ in self.graph_points]
+            self.layer_keys = [None for _ in self.graph_points]
         self.resolution = resolution
         self.pos = pos
-        self.font = pygame.font.Font(path.join("Assets", "FiraCode.ttf"), min(resolution) // 60)
+        self.font = font(min(resolution) // 60)
         self.x_bounds = x_range
         self.y_bounds = y_range
         self.range = x_range[1] - x_range[0], y_range[1] - y_range[0]
@@ -59,6 +74,17 @@ class Grapher:
         self.dec_places: tuple = floor(log10(self.range[0] * 0.25)), floor(log10(self.range[1] * 0.25))
         return None
     
+    def add_function(self) -> None:
+        """
+        Gives a new function its own empty layer
+        """
+        self.graph_points.append(pack_polylines([]))
+        self.layers.append(None)
+        self.layer_keys.append(None)
+        self.shown.append(True)
+        self.reveals.append(None)
+        return None
+    
     def new_bounds(self, x_axis: bool, transformation: str) -> tuple[str, str]:
         """
         Returns the new boundaries after a transformation, if the transformation valid
@@ -102,86 +128,165 @@ class Grapher:
         Assigns $m and $n variables or
         Returns the left and right hand sides of a valid equation.
         If the equation is invalid, it will return some error code between 1 and 5
+        Runs the equation's maths on the calling thread, the main loop checks typed equations with a Validator instead
         """
-        # Check if the function is only assigning to variable m
-        if equ_raw.startswith("m=") or equ_raw.startswith("m =") and 'x' not in equ_raw and 'y' not in equ_raw:
-            try:
-                self.old_m, self.m = self.m, eval(equ_raw.split('=')[1].strip())
-            except (ArithmeticError, TypeError, SyntaxError, SyntaxWarning, NameError, ValueError, OverflowError):
-                pass
-            return None, 10
-        # Check if the function is only assigning to variable n
-        if equ_raw.startswith("n=") or equ_raw.startswith("n =") and 'x' not in equ_raw and 'y' not in equ_raw:
-            if equ_raw.count('=') == 1 and len(equ_raw.split('=')) > 1:
-                try:
-                    self.old_n, self.n = self.n, eval(equ_raw.split('=')[1].strip())
-                except (ArithmeticError, TypeError, SyntaxError, SyntaxWarning, NameError, ValueError, OverflowError):
-                    pass
-                return None, 11
-        
-        # Invalidate equations with guaranteed empty graphs
-        if equ_raw.count('=') != 1 or ('x' not in equ_raw and 'y' not in equ_raw):  # If not a relation of x or y
-            return None, 1
-        if "/0" in equ_raw.replace(' ', ""):  # If division by zero is a literal
-            return None, 2
-        
-        # Replace symbols with constants or python-readable version
-        formatted_equation = format_equation(equ_raw, self.m, self.n)
-        
-        try:
-            # Evaluate both sides to find inherent mistakes in input
-            eval(formatted_equation[0].strip().replace('x', '1').replace('y', '1')),  # 1 is a testing value
-            eval(formatted_equation[1].strip().replace('x', '1').replace('y', '1'))
-        except ZeroDivisionError:  # e.g. 1/x when x = 0
-            pass
-        except ValueError:  # e.g. out of domain of arcsin (-1, 1)
-            pass
-        except ArithmeticError:
-            return None, 2
-        except NameError:
-            return None, 3
-        except (SyntaxError, SyntaxWarning):
-            return None, 4
-        except TypeError:
-            return None, 5
-        
-        return (formatted_equation[0].strip(), formatted_equation[1].strip()), 0
+        with span("parse"):
+            equation, code, value = check_equation(equ_raw, self.m, self.n)
+        if code in (10, 11):
+            self.assign("mn"[code - 10], value)
+        return equation, code
+    
+    def assign(self, name: str, value: float | None) -> bool:
+        """
+        Sets $m or $n, unless the value it was assigned couldn't be evaluated
+        Returns True if the value changed
+        """
+        if value is None:
+            return False
+        if name == 'm':
+            self.old_m, self.m = self.m, value
+            return self.old_m != self.m
+        self.old_n, self.n = self.n, value
+        return self.old_n != self.n
     
+    @traced("clear_graph")
     def clear_graph(self) -> None:
         """
         Places a blank graph on top of drawn graphs and draws grid lines
+        The grid is rendered once per view, so clearing the same view again is a single blit
+        """
+        key: tuple = self.x_bounds, self.y_bounds, self.resolution
+        if key in self.backgrounds:
+            self.backgrounds.move_to_end(key)
+        else:
+            self.backgrounds[key] = self.render_background()
+            if len(self.backgrounds) > BACKGROUND_CACHE:
+                self.backgrounds.popitem(last=False)
+        self.window.blit(self.backgrounds[key], self.pos)
+        mark_dirty(self.area())
+        return None
+    
+    def layer_key(self, text: str) -> tuple:
+        return text, self.m, self.n, self.x_bounds, self.y_bounds, self.resolution
+    
+    def is_current(self, idx: int, text: str) -> bool:
+        """
+        If a function's layer already shows the equation over the current bounds
+        """
+        return self.layer_keys[idx] == self.layer_key(text)
+    
+    def layer(self, idx: int) -> pygame.Surface:
+        """
+        A function's layer, allocated the first time it is drawn on
+        """
+        if self.layers[idx] is None:
+            self.layers[idx] = pygame.Surface(self.resolution, pygame.SRCALPHA)
+        return self.layers[idx]
+    
+    def clear_layer(self, idx: int) -> None:
+        """
+        Empties a function's layer, freeing it until the function draws something again
+        """
+        self.layers[idx] = None
+        self.changed = True
+        return None
+    
+    def begin_layer(self, idx: int, text: str) -> None:
+        """
+        Empties a function's layer to draw an equation over the current bounds
+        """
+        self.clear_layer(idx)
+        self.layer_keys[idx] = self.layer_key(text)
+        self.reveals[idx] = None
+        return None
+    
+    def show_layer(self, idx: int, shown: bool) -> None:
+        if self.shown[idx] != shown:
+            self.shown[idx] = shown
+            self.changed = True
+        return None
+    
+    @traced("composite")
+    def composite(self) -> None:
         """
-        bg = pygame.draw.rect(surface=self.window, color=BG_COLOR, rect=pygame.Rect(self.pos, self.resolution))
-        pygame.draw.line(surface=self.window, color=(0, 0, 0), start_pos=bg.midleft, end_pos=bg.midright, width=1)
-        pygame.draw.line(surface=self.window, color=(0, 0, 0), start_pos=bg.midtop, end_pos=bg.midbottom, width=1)
+        Draws the blank graph, then every shown function's layer over it in order, functions without one are empty
+        """
+        self.changed = False  # Cleared first, so layers drawn on meanwhile are composited next time
+        self.clear_graph()
+        for idx, (layer, shown) in enumerate(zip(self.layers, self.shown)):
+            if not shown or layer is None:
+                continue
+            area: pygame.Rect = layer.get_rect()
+            if self.reveals[idx] is not None:  # Animating, wipe the layer in from the left
+                progress: float = (perf_counter() - self.reveals[idx]) / ANIMATION_TIME
+                if progress < 1:
+                    area.width = int(area.width * progress)
+                    self.changed = True  # Keep compositing until the animation ends
+                else:
+                    self.reveals[idx] = None
+            # Antialiased lines on a transparent surface come out premultiplied
+            self.window.blit(layer, self.pos, area, special_flags=pygame.BLEND_PREMULTIPLIED)
+        pygame.draw.rect(surface=self.window, color=BORDER_COLOR,
+                         rect=pygame.Rect(self.pos, [r + 1 for r in self.resolution]), width=1)
+        return None
+    
+    def render_background(self) -> pygame.Surface:
+        """
+        Draws the blank graph, its axes, grid markers, number labels and border onto a new surface
+        """
+        background: pygame.Surface = pygame.Surface([r + 1 for r in self.resolution])
+        bg = background.fill(BG_COLOR, pygame.Rect((0, 0), self.resolution))
+        pygame.draw.line(surface=background, color=(0, 0, 0), start_pos=bg.midleft, end_pos=bg.midright, width=1)
+        pygame.draw.line(surface=background, color=(0, 0, 0), start_pos=bg.midtop, end_pos=bg.midbottom, width=1)
         border_res = [r + 1 for r in self.resolution]
+        label_size: int = min(self.resolution) // 60
         
-        # Drawing grid markers and number labels
-        step: tuple = 10**self.dec_places[0], 10**self.dec_places[1]
-        for x in arange(floor(self.x_bounds[0]), floor(self.x_bounds[1]) + 1, step[0]):
-            if self.x_bounds[0] <= x <= self.x_bounds[1]:
-                axis_coord: tuple = self.graph_to_window(x, 0.5 * (self.y_bounds[0] + self.y_bounds[1]))
-                pygame.draw.line(surface=self.window, color=(0, 0, 0), start_pos=(axis_coord[0], axis_coord[1] + 3),
+        with span("labels"):  # Grid markers and number labels
+            x_ticks, x_exponent = self.axis_ticks(0, label_size)
+            for x, x_label in zip(x_ticks, tick_labels(x_ticks, x_exponent)):
+                axis_coord: tuple = self.graph_to_surface(x, 0.5 * (self.y_bounds[0] + self.y_bounds[1]))
+                pygame.draw.line(surface=background, color=(0, 0, 0),
+                                 start_pos=(axis_coord[0], axis_coord[1] + 3),
                                  end_pos=(axis_coord[0], axis_coord[1] - 3), width=1)
-                if self.pos[0] < axis_coord[0] + 15 < self.pos[0] + self.resolution[0]:
-                    num = self.font.render(d_round(x, -self.dec_places[0]), True, (120, 0, 0))
-                    num_tilt = pygame.transform.rotate(num, 180)
-                    num_rect: pygame.Rect = num_tilt.get_rect(topleft=(axis_coord[0] + 3, axis_coord[1] + 5))
-                    self.window.blit(num, num_rect)
+                if 0 < axis_coord[0] + 15 < self.resolution[0]:
+                    num = label(x_label, (120, 0, 0), label_size)
+                    num_rect: pygame.Rect = num.get_rect(topleft=(axis_coord[0] + 3, axis_coord[1] + 5))
+                    background.blit(num, num_rect)
         
-        for y in arange(floor(self.y_bounds[0]), floor(self.y_bounds[1]) + 1, step[1]):
-            if self.y_bounds[0] <= y <= self.y_bounds[1]:
-                axis_coord: tuple = self.graph_to_window(0.5 * (self.x_bounds[0] + self.x_bounds[1]), y)
-                pygame.draw.line(surface=self.window, color=(0, 0, 0), start_pos=(axis_coord[0] + 3, axis_coord[1]),
+            y_ticks, y_exponent = self.axis_ticks(1, label_size)
+            for y, y_label in zip(y_ticks, tick_labels(y_ticks, y_exponent)):
+                axis_coord: tuple = self.graph_to_surface(0.5 * (self.x_bounds[0] + self.x_bounds[1]), y)
+                pygame.draw.line(surface=background, color=(0, 0, 0),
+                                 start_pos=(axis_coord[0] + 3, axis_coord[1]),
                                  end_pos=(axis_coord[0] - 3, axis_coord[1]), width=1)
-                if self.pos[1] < axis_coord[1] + 5 + self.font.get_linesize() < self.pos[1] + self.resolution[1]:
-                    num = self.font.render(d_round(y, -self.dec_places[1]), True, (0, 0, 120))
+                if 0 < axis_coord[1] + 5 + self.font.get_linesize() < self.resolution[1]:
+                    num = label(y_label, (0, 0, 120), label_size)
                     num_rect: pygame.Rect = num.get_rect(topleft=(axis_coord[0] + 5, axis_coord[1] + 3))
-                    self.window.blit(num, num_rect)
+                    background.blit(num, num_rect)
         
-        pygame.draw.rect(surface=self.window, color=BORDER_COLOR,
-                         rect=pygame.Rect((self.pos[0], self.pos[1]), border_res), width=1)
-        return None
+        pygame.draw.rect(surface=background, color=BORDER_COLOR, rect=pygame.Rect((0, 0), border_res), width=1)
+        return background
+    
+    def axis_ticks(self, axis: int, label_size: int) -> tuple[list[float], int]:
+        """
+        The ticks along the x (0) or y (1) axis, see nice_ticks, spaced at least TICK_SPACING labels apart
+        Ticks along x are spread further if their labels are wider than that
+        """
+        bounds: tuple[float, float] = self.y_bounds if axis else self.x_bounds
+        spacing: float = TICK_SPACING * max(label_size, 1)
+        ticks, exponent = nice_ticks(bounds, int(self.resolution[axis] // spacing))
+        if not axis and ticks:
+            end_labels: list[str] = tick_labels(ticks, exponent)[::max(len(ticks) - 1, 1)]
+            widest: int = max(font(max(label_size, 1)).size(text)[0] for text in end_labels)
+            if widest + label_size > spacing:
+                ticks, exponent = nice_ticks(bounds, int(self.resolution[0] // (widest + label_size)))
+        return ticks, exponent
+    
+    def area(self) -> pygame.Rect:
+        """
+        The graph and its border in the window
+        """
+        return pygame.Rect(self.pos, (self.resolution[0] + 2, self.resolution[1] + 2))
     
     def window_to_graph(self, x: float, y: float) -> tuple[float, float] | None:
         """
@@ -193,6 +298,12 @@ class Grapher:
                 self.y_bounds[1] - (y - self.pos[1]) / self.stretch[1]
         return None
     
+    def graph_to_surface(self, x: float, y: float) -> tuple[float, float]:
+        """
+        Applies transformations from a point on a function to a point on a surface the size of the graph
+        """
+        return abs(self.x_bounds[0] - x) * self.stretch[0], abs(self.y_bounds[1] - y) * self.stretch[1]
+    
     def graph_to_window(self, x: float, y: float, correction: bool = False) -> tuple[float, float]:
         """
         Applies transformations from a point on a function to a point in the PyGame window
@@ -200,149 +311,45 @@ class Grapher:
         return self.pos[0] + abs(self.x_bounds[0] - x) * self.stretch[0] + int(correction), \
             self.pos[1] + abs(self.y_bounds[1] - y) * self.stretch[1] + int(correction)
     
-    def function_graph(self, equation: tuple[str, str], indicator: Text, color: tuple, width: int) -> None:
+    def function_graph(self, equation: tuple[str, str], indicator: Text, color: tuple, width: int,
+                       layer: int = 0) -> None:
         """
-        Generates graph my iterating over each x value of function, rather than every pixel
+        Generates graph by sampling the function adaptively along x (or y), rather than every pixel
         Supports y and x functions. i.e. y = f(x) or x = f(y)
+        Draws onto the layer of function number layer
         """
-        lhs, rhs = equation
-        is_y_function: bool = lhs == "(y)"
         indicator.draw()  # Show on function input that graph is being calculated
-        
-        if is_y_function:  # Function is known to be a y function
-            x_points, y_points = linspace(self.x_bounds[0], self.x_bounds[1], num=self.resolution[0]), []
-            for x in x_points:
-                try:
-                    y_point = eval(rhs.replace('x', str(x)), {}, func_dict)
-                    y_points.append(y_point)
-                except (ArithmeticError, ValueError, TypeError, OverflowError):
-                    y_points.append(None)
-        else:  # Is x function
-            x_points, y_points = [], linspace(self.y_bounds[0], self.y_bounds[1], num=self.resolution[1])
-            for y in y_points:
-                try:
-                    x_point = eval(rhs.replace('y', str(y)), {}, func_dict)
-                    x_points.append(x_point)
-                except (ArithmeticError, ZeroDivisionError, ValueError, TypeError):
-                    x_points.append(None)
-        
-        # Add zero to the graph if it is within boundaries
-        if self.x_bounds[0] < 0 < self.x_bounds[1] and self.y_bounds[0] < 0 < self.y_bounds[1]:
-            try:
-                if is_y_function:
-                    x_points = list(x_points)
-                    points = list(zip(x_points, y_points))
-                    points.append((0, eval(rhs.replace('x', '0'), {}, func_dict)))
-                    points.sort()
-                    x_points, y_points = points
-                else:
-                    y_points = list(y_points)
-                    points = list(zip(x_points, y_points))
-                    points.append((eval(rhs.replace('y', '0'), {}, func_dict), 0))
-                    points.sort()
-                    x_points, y_points = points
-            except (ArithmeticError, ValueError, TypeError, OverflowError):
-                pass
-        
-        stroke_points: list = []
-        pen_down: bool = False
-        prev_x, prev_y = None, None
-        for idx, (x, y) in enumerate(zip(x_points, y_points)):
-            try:
-                if not (x is None or y is None):  # If there is a point to be drawn for this x_value
-                    if is_y_function:
-                        if self.y_bounds[0] <= y <= self.y_bounds[1]:  # If current point falls within y_bounds
-                            if not len(stroke_points) and idx > 0 and prev_y:  # If the previous point outside of range
-                                # Find y-range intercept
-                                y_bound_hit = 1 if prev_y > self.y_bounds[1] else 0
-                                tan_theta = (y - prev_y) / (x - prev_x)
-                                casted_x = prev_x + (self.y_bounds[y_bound_hit] - prev_y) / tan_theta
-                                casted_y = self.y_bounds[y_bound_hit]
-                                
-                                # Add a point just after function comes back into the graph
-                                stroke_points.append(self.graph_to_window(casted_x, casted_y))
-                            # Add point to graph
-                            stroke_points.append(self.graph_to_window(x, y))
-                            pen_down = True
-                        
-                        elif pen_down:  # Function continues outside of range
-                            # Find y-range intercept
-                            y_bound_hit = 1 if y > self.y_bounds[1] else 0
-                            tan_theta = (y - prev_y) / (x - prev_x)
-                            casted_x = prev_x + (self.y_bounds[y_bound_hit] - prev_y) / tan_theta
-                            casted_y = self.y_bounds[y_bound_hit]
-                            
-                            # Add a point just before function leaves graph
-                            stroke_points.append(self.graph_to_window(casted_x, casted_y))
-                            pen_down = False  # Draw the current continuity
-                    else:  # Graph for x function, reflected over y = x
-                        if self.x_bounds[0] <= x <= self.x_bounds[1]:  # If current point falls within x_bounds
-                            if not len(stroke_points) and idx > 0 and prev_x:  # If the previous point outside of range
-                                # Find x-range intercept
-                                x_bound_hit = 1 if prev_x > self.x_bounds[1] else 0
-                                tan_theta = (x - prev_x) / (y - prev_y)
-                                casted_x = self.x_bounds[x_bound_hit]
-                                casted_y = prev_y + (self.x_bounds[x_bound_hit] - prev_x) / tan_theta
-            
-                                # Add a point just after function comes back into the graph
-                                stroke_points.append(self.graph_to_window(casted_x, casted_y))
-                            # Add point to graph
-                            stroke_points.append(self.graph_to_window(x, y))
-                            pen_down = True
-    
-                        elif pen_down:  # Function continues outside of range
-                            # Find x-range intercept
-                            x_bound_hit = 1 if x > self.x_bounds[1] else 0
-                            tan_theta = (x - prev_x) / (y - prev_y)
-                            casted_x = self.x_bounds[x_bound_hit]
-                            casted_y = prev_y + (self.x_bounds[x_bound_hit] - prev_x) / tan_theta
-        
-                            # Add a point just before function leaves graph
-                            stroke_points.append(self.graph_to_window(casted_x, casted_y))
-                            pen_down = False
-                else:  # Point will not be drawn
-                    pen_down = False  # Draw the current continuity
-                    
-                prev_x, prev_y = x, y
-            except TypeError:
-                pass
-            
-            if not pen_down and len(stroke_points):  # If graph has gone out of range, draw current line
-                pygame.draw.aalines(surface=self.window, color=color, closed=False, points=stroke_points, blend=width)
-                stroke_points.clear()
-        if len(stroke_points):  # If function reaches end of graph without break, draw everything
-            pygame.draw.aalines(surface=self.window, color=color, closed=False, points=stroke_points, blend=width)
-        
+        with span("evaluate"):
+            vertices, starts = explicit_strokes(equation, self.x_bounds, self.y_bounds, self.resolution)
+        self.draw_strokes(layer, vertices, starts, color, width)
         indicator.hide(BG_COLOR)  # Remove "Rendering..." from function input
         return None
     
+    def draw_strokes(self, idx: int, vertices: numpy.ndarray, starts: list[int], color: tuple, width: int) -> None:
+        """
+        Draws the strokes of an explicit function, as returned by explicit_strokes, onto its layer
+        """
+        with span("clip"):  # Every vertex is transformed in one vectorized step
+            pixels: list = graph_to_pixels(vertices, self.x_bounds, self.y_bounds, self.stretch).tolist()
+            # Each continuous part of the function inside the graph
+            strokes: list[list] = [pixels[start:end] for start, end in zip(starts, starts[1:] + [len(pixels)])]
+        with span("aalines"):
+            for stroke in strokes:
+                pygame.draw.aalines(surface=self.layer(idx), color=color, closed=False, points=stroke, blend=width)
+        self.changed = True
+        return None
+    
     def iterative_graph(self, equation: tuple[str, str], indicator: Text, color: tuple, width: int, idx: int) -> None:
         """
         DEPRECATED
-        Function to generate and draw a graph by iterating over every pixel, uses multithreading
+        Function to generate and draw a graph by tracing its contour over every pixel
         """
-        lhs, rhs = equation
         indicator.draw()
         
-        # Helps determine if function lies within a 'pixel'; tolerance
-        x_tol, y_tol = self.range[0] / self.resolution[0] * 0.5, self.range[1] / self.resolution[1] * 0.5
-        
-        # Generate information for computation of plotted points
-        # i.e. equation, coordinates to be iterated, tolerances
-        info_packs: list[tuple] = []
-        for x in linspace(self.x_bounds[0], self.x_bounds[1], num=self.resolution[0]):
-            for y in linspace(self.y_bounds[0], self.y_bounds[1], num=self.resolution[1]):
-                info_packs.append((lhs, rhs, (x, y), x_tol, y_tol))
-        if self.x_bounds[0] < 0 < self.x_bounds[1]:
-            for y in linspace(self.y_bounds[0], self.y_bounds[1], num=self.resolution[1]):
-                info_packs.append((lhs, rhs, (0, y), x_tol, y_tol))
-        if self.y_bounds[0] < 0 < self.y_bounds[1]:
-            for x in linspace(self.x_bounds[0], self.x_bounds[1], num=self.resolution[0]):
-                info_packs.append((lhs, rhs, (x, 0), x_tol, y_tol))
-        
-        self.graph_points[idx] = generate_plot_points(info_packs)
+        self.graph_points[idx] = pack_polylines(implicit_polylines(equation, self.x_bounds, self.y_bounds,
+                                                                   self.resolution))
         indicator.hide(BG_COLOR)
-        if not self.graph_points[idx]:
+        if not len(self.graph_points[idx][1]):
             print("Function", idx + 1, "empty graph")
         else:
             # Draw graph on screen
@@ -350,18 +357,17 @@ class Grapher:
         
         return None
         
-    def draw_graph(self, idx, color: tuple, width: int) -> None:
+    def draw_graph(self, idx: int, color: tuple, width: int, animate: bool = True) -> None:
         """
-        Draws points from the stored points of the function onto the graph
+        Draws the stored polylines of the function onto its layer all at once
+        If animate, the layer is then revealed over ANIMATION_TIME while compositing, the drawing doesn't wait for it
         """
-        for point in self.graph_points[idx]:
-            if self.x_bounds[0] <= point[0] <= self.x_bounds[1] and self.y_bounds[0] <= point[1] <= self.y_bounds[1]:
-                # Point falls within the graph boundary
-                adjusted_point: tuple[float, float] = self.graph_to_window(point[0], point[1], True)
-                sleep(0.5 / len(self.graph_points[idx]))  # Animate drawing, takes 1 second to finish
-                pygame.draw.rect(surface=self.window, color=color, rect=pygame.Rect(adjusted_point, (width, width)))
-        
-        border_res = [r + 2 * width for r in self.resolution]
-        pygame.draw.rect(surface=self.window, color=BORDER_COLOR,
-                         rect=pygame.Rect((self.pos[0], self.pos[1]), border_res), width=width)
+        with span("clip"):  # Every vertex is transformed and clipped in one vectorized step
+            strokes: list[list] = polyline_strokes(self.graph_points[idx], self.x_bounds, self.y_bounds, self.stretch)
+        with span("aalines"):
+            for stroke in strokes:
+                pygame.draw.aalines(surface=self.layer(idx), color=color, closed=False, points=stroke, blend=width)
+        if animate:
+            self.reveals[idx] = perf_counter()
+        self.changed = True
         return None
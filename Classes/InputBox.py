@@ -3,6 +3,8 @@ from copy import deepcopy
 
 import pygame
 
+from Scripts.DisplayUtilities import mark_dirty
+
 
 class InputBox:
     def __init__(self, window: pygame.Surface, pos: tuple[int, int], width: int,
@@ -25,6 +27,7 @@ class InputBox:
         self.index: int = len(self.text)
         self.lindex: int = self.index  # Holds position of cursor to show
         self.view: int = 0  # Holds the first character to be shown
+        self.drawn: tuple | None = None  # State last drawn, the box is only redrawn when it changes
     
     def insert_text(self, text: str, function: bool = True) -> None:
         """
@@ -113,6 +116,9 @@ class InputBox:
         return old_text != self.text
     
     def draw(self) -> None:
+        if self.drawn == (self.text, self.view, self.active, self.cursor_pos):
+            return None
+        self.drawn = self.text, self.view, self.active, self.cursor_pos
         pygame.draw.rect(surface=self.window, color=(255, 255, 255, 255), rect=pygame.Rect(self.pos, self.size))
         box_text = self.font.render(self.text[self.view:self.view + self.text_limit], True, self.text_color)
         box = box_text.get_rect(midleft=(self.rect.midleft[0] + 3, self.rect.midleft[1]))
@@ -121,4 +127,5 @@ class InputBox:
         if self.active:  # Draw cursor
             pygame.draw.line(surface=self.window, color=self.text_color, start_pos=(self.cursor_pos, self.rect.top + 2),
                              end_pos=(self.cursor_pos, self.rect.bottom - 2), width=1)
+        mark_dirty(self.rect)
         return None
@@ -0,0 +1,107 @@
+from math import inf, nan
+
+import numpy
+
+
+class Interval:
+    """
+    Arrays of closed intervals [lo, hi], one per graph cell, with the arithmetic formatted equations use
+    Each result holds every value the expression takes for any point inside the cell
+    Cells where the expression is undefined everywhere are NaN
+    """
+    def __init__(self, lo, hi):
+        self.lo: numpy.ndarray = numpy.asarray(lo, dtype=float)
+        self.hi: numpy.ndarray = numpy.asarray(hi, dtype=float)
+
+    @staticmethod
+    def of(value) -> "Interval":
+        """
+        Turns a constant into an interval holding only itself
+        """
+        return value if isinstance(value, Interval) else Interval(value, value)
+
+    def contains_zero(self) -> numpy.ndarray:
+        with numpy.errstate(invalid="ignore"):
+            return (self.lo <= 0) & (self.hi >= 0)
+
+    def __neg__(self) -> "Interval":
+        return Interval(-self.hi, -self.lo)
+
+    def __pos__(self) -> "Interval":
+        return self
+
+    def __add__(self, other) -> "Interval":
+        other = Interval.of(other)
+        return Interval(self.lo + other.lo, self.hi + other.hi)
+
+    def __radd__(self, other) -> "Interval":
+        return self + other
+
+    def __sub__(self, other) -> "Interval":
+        other = Interval.of(other)
+        return Interval(self.lo - other.hi, self.hi - other.lo)
+
+    def __rsub__(self, other) -> "Interval":
+        return Interval.of(other) - self
+
+    def __mul__(self, other) -> "Interval":
+        other = Interval.of(other)
+        with numpy.errstate(invalid="ignore"):  # 0 * inf is treated as 0 by fmin/fmax skipping the NaN
+            products = self.lo * other.lo, self.lo * other.hi, self.hi * other.lo, self.hi * other.hi
+        low = numpy.fmin(numpy.fmin(products[0], products[1]), numpy.fmin(products[2], products[3]))
+        high = numpy.fmax(numpy.fmax(products[0], products[1]), numpy.fmax(products[2], products[3]))
+        return Interval(low, high)
+
+    def __rmul__(self, other) -> "Interval":
+        return self * other
+
+    def __truediv__(self, other) -> "Interval":
+        other = Interval.of(other)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            reciprocal = Interval(1 / other.hi, 1 / other.lo)
+            across_zero = other.contains_zero()  # Division by zero somewhere in the cell, could be anything
+            reciprocal.lo[across_zero], reciprocal.hi[across_zero] = -inf, inf
+        return self * reciprocal
+
+    def __rtruediv__(self, other) -> "Interval":
+        return Interval.of(other) / self
+
+    def __pow__(self, power) -> "Interval":
+        if not isinstance(power, Interval) and float(power).is_integer():
+            return self.integer_power(int(power))
+
+        # x^p = e^(p * ln(x)) is only defined for x >= 0 here, and p * ln(x) is bilinear,
+        # so the extremes lie on the corners of the cell
+        base, power = self.clip(0, inf), Interval.of(power)
+        with numpy.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            corners = base.lo ** power.lo, base.lo ** power.hi, base.hi ** power.lo, base.hi ** power.hi
+        low = numpy.fmin(numpy.fmin(corners[0], corners[1]), numpy.fmin(corners[2], corners[3]))
+        high = numpy.fmax(numpy.fmax(corners[0], corners[1]), numpy.fmax(corners[2], corners[3]))
+        return Interval(low, high)
+
+    def __rpow__(self, base) -> "Interval":
+        return Interval.of(base) ** self
+
+    def integer_power(self, power: int) -> "Interval":
+        if power < 0:
+            return 1 / self.integer_power(-power)
+        with numpy.errstate(over="ignore"):
+            lo_power, hi_power = self.lo ** power, self.hi ** power
+        if power % 2:  # Odd powers are increasing
+            return Interval(lo_power, hi_power)
+        # Even powers fall then rise, with a minimum of 0 if zero is in the cell
+        low = numpy.where(self.contains_zero(), 0, numpy.fmin(lo_power, hi_power))
+        return Interval(low, numpy.fmax(lo_power, hi_power))
+
+    def clip(self, low: float, high: float) -> "Interval":
+        """
+        Restricts the intervals to a function's domain, intervals entirely outside of it become NaN
+        """
+        with numpy.errstate(invalid="ignore"):
+            outside = (self.hi < low) | (self.lo > high)
+        clipped = Interval(numpy.clip(self.lo, low, high), numpy.clip(self.hi, low, high))
+        clipped.lo[outside], clipped.hi[outside] = nan, nan
+        return clipped
+
+    def __repr__(self) -> str:
+        return f"Interval({self.lo}, {self.hi})"
@@ -0,0 +1,66 @@
+from time import perf_counter
+import pygame
+
+from Scripts.TraceUtilities import frame_stats, stage_times, latencies
+from Scripts.DisplayUtilities import mark_dirty, font
+
+OVERLAY_REFRESH: float = 0.25  # Seconds between redraws, so the overlay itself barely costs anything
+STAGE_LABELS: dict = {"parse": "prs", "evaluate": "eval", "clip": "clip", "aalines": "aa", "labels": "lbl",
+                      "collect": "tile", "update": "upd"}
+OVERLAY_FUNCTIONS: int = 4  # Render latencies shown, the slowest functions' once there are more
+
+
+class PerformanceOverlay:
+    """
+    Toggleable readout of the frame time, FPS against the tick rate, the slowest stages
+    and the latency of each function's last render, drawn right-aligned from pos
+    """
+    def __init__(self, window: pygame.Surface, pos: tuple[int, int], text_size: int, color: tuple, bg_color: tuple):
+        self.window: pygame.Surface = window
+        self.pos: tuple[int, int] = pos  # Top-right
+        self.color: tuple = color
+        self.bg_color: tuple = bg_color
+        self.font: pygame.font = font(text_size)
+        self.shown: bool = False
+        self.last_draw: float = 0
+        self.area: pygame.Rect = pygame.Rect(pos, (0, 0))  # Covered by the last draw
+
+    def toggle(self) -> None:
+        self.shown = not self.shown
+        if not self.shown:
+            self.hide()
+        self.last_draw = 0
+        return None
+
+    def hide(self) -> None:
+        self.window.fill(self.bg_color, self.area)
+        mark_dirty(self.area)
+        return None
+
+    def draw(self, tick: int, functions: int) -> None:
+        """
+        Redraws the readout if it is shown and hasn't been redrawn recently
+        """
+        if not self.shown or perf_counter() - self.last_draw < OVERLAY_REFRESH:
+            return None
+        self.last_draw = perf_counter()
+        busy, fps = frame_stats()
+        stages: list = sorted(stage_times().items(), key=lambda stage: -stage[1])
+        shown: list[int] = list(range(functions))
+        if functions > OVERLAY_FUNCTIONS:
+            shown = sorted(latencies, key=lambda i: -latencies[i])[:OVERLAY_FUNCTIONS]
+        lines: list[str] = [
+            f"{busy:.1f}ms {fps:.0f}/{tick}fps",
+            " ".join([f"{STAGE_LABELS[name]} {time:.1f}" for name, time in stages if name in STAGE_LABELS][:3]),
+            " ".join(f"f{i + 1} " + (f"{latencies[i] * 1000:.0f}" if i in latencies else "-") for i in shown)
+        ]
+
+        self.hide()
+        self.area = pygame.Rect(self.pos, (0, 0))
+        for i, line in enumerate(lines):
+            label: pygame.Surface = self.font.render(line, True, self.color, self.bg_color)
+            label_box: pygame.Rect = label.get_rect(topright=(self.pos[0], self.pos[1] + i * self.font.get_linesize()))
+            self.window.blit(label, label_box)
+            self.area.union_ip(label_box)
+        mark_dirty(self.area)
+        return None
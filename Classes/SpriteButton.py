@@ -2,6 +2,7 @@ from os import path
 import pygame
 
 from Classes.Button import Button
+from Scripts.DisplayUtilities import mark_dirty, label
 
 
 class SpriteButton(Button):
@@ -12,7 +13,7 @@ class SpriteButton(Button):
         self.text: str = text
         self.text_size: int = text_size
         self.text_color: tuple = text_color
-        self.label = pygame.font.Font(path.join("Assets", "FiraCode.ttf"), text_size).render(text, True, text_color)
+        self.label: pygame.Surface = label(text, text_color, text_size)
         self.label_box = self.label.get_rect(center=self.rect.center)
         
         self.click_sound: pygame.mixer.Sound = pygame.mixer.Sound(path.join("Assets", "thock.wav"))
@@ -21,6 +22,7 @@ class SpriteButton(Button):
         self.sprite: pygame.Surface = norm_sprite  # Holds button's current color
         self.norm_sprite: pygame.Surface = norm_sprite
         self.hover_sprite: pygame.Surface = hover_sprite if hover_sprite else norm_sprite
+        self.drawn: tuple | None = None  # Sprite and text last drawn, the button is only redrawn when they change
     
     def update(self) -> bool:
         super().update()
@@ -31,9 +33,12 @@ class SpriteButton(Button):
         return orig_sprite != self.sprite  # If there is a change in sprite
     
     def draw(self) -> None:
-        self.label = pygame.font.Font(path.join("Assets", "FiraCode.ttf"), self.text_size)\
-            .render(self.text, True, self.text_color)
+        if self.drawn == (self.sprite, self.text):
+            return None
+        self.drawn = self.sprite, self.text
+        self.label = label(self.text, self.text_color, self.text_size)
         self.label_box = self.label.get_rect(center=self.rect.center)
         self.window.blit(self.sprite, self.rect)
         self.window.blit(self.label, self.label_box)
+        mark_dirty(self.rect.union(self.label_box))
         return None
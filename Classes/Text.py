@@ -1,6 +1,7 @@
-from os import path
 import pygame
 
+from Scripts.DisplayUtilities import mark_dirty, font, label
+
 
 class Text:
     def __init__(self, window: pygame.Surface, text: str, text_size: int, color: tuple, pos: tuple[int, int]):
@@ -9,20 +10,29 @@ class Text:
         self.text_size: int = text_size
         self.color: tuple[int, int, int] = color
         self.pos: tuple[int, int] = pos
-        self.font: pygame.font = pygame.font.Font(path.join("Assets", "FiraCode.ttf"), self.text_size)
+        self.font: pygame.font = font(self.text_size)
+        self.drawn: tuple | None = None  # What was last blitted, so repeated draws and hides are skipped
     
     def draw(self, from_right: bool = False) -> None:
-        label: pygame.Surface = self.font.render(self.text, True, self.color)
-        label_box: pygame.Rect = label.get_rect(topleft=self.pos)
+        if self.drawn == (True, self.text, self.color, from_right):
+            return None
+        self.drawn = True, self.text, self.color, from_right
+        text_label: pygame.Surface = label(self.text, self.color, self.text_size)
+        label_box: pygame.Rect = text_label.get_rect(topleft=self.pos)
         if from_right:
             label_box.right = self.pos[0]
-        self.window.blit(label, label_box)
+        self.window.blit(text_label, label_box)
+        mark_dirty(label_box)
         return None
     
     def hide(self, color: tuple, from_right: bool = False) -> None:
-        label: pygame.Surface = self.font.render(self.text, True, color, color)
-        label_box: pygame.Rect = label.get_rect(topleft=self.pos)
+        if self.drawn == (False, self.text, color, from_right):
+            return None
+        self.drawn = False, self.text, color, from_right
+        text_label: pygame.Surface = label(self.text, color, self.text_size, color)
+        label_box: pygame.Rect = text_label.get_rect(topleft=self.pos)
         if from_right:
             label_box.right = self.pos[0]
-        self.window.blit(label, label_box)
+        self.window.blit(text_label, label_box)
+        mark_dirty(label_box)
         return None
@@ -0,0 +1,45 @@
+from collections import OrderedDict
+
+import numpy
+
+TILE_CACHE_BUDGET: int = 64 * 2**20  # Bytes of polylines kept before the least recently used tiles are dropped
+TILE_BYTES: int = 256  # The tuple and the two arrays a tile's packed polylines are held in
+
+
+class TileCache:
+    """
+    Least recently used store of rendered tiles, keyed by (equation, $m, $n, zoom level, tile index)
+    Each tile holds the packed polylines of a relation inside it, see pack_polylines,
+    the oldest tiles are evicted to stay within budget
+    """
+    def __init__(self, budget: int = TILE_CACHE_BUDGET):
+        self.budget: int = budget
+        self.tiles: OrderedDict = OrderedDict()
+        self.size: int = 0  # Estimated bytes held
+
+    @staticmethod
+    def tile_size(polylines: tuple[numpy.ndarray, numpy.ndarray]) -> int:
+        return TILE_BYTES + polylines[0].nbytes + polylines[1].nbytes
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self.tiles
+
+    def get(self, key: tuple) -> tuple[numpy.ndarray, numpy.ndarray] | None:
+        if key not in self.tiles:
+            return None
+        self.tiles.move_to_end(key)
+        return self.tiles[key]
+
+    def put(self, key: tuple, polylines: tuple[numpy.ndarray, numpy.ndarray]) -> None:
+        if key in self.tiles:
+            self.size -= self.tile_size(self.tiles.pop(key))
+        self.tiles[key] = polylines
+        self.size += self.tile_size(polylines)
+        while self.size > self.budget and len(self.tiles) > 1:
+            self.size -= self.tile_size(self.tiles.popitem(last=False)[1])
+        return None
+
+    def clear(self) -> None:
+        self.tiles.clear()
+        self.size = 0
+        return None
@@ -0,0 +1,297 @@
+from itertools import count
+from time import perf_counter, sleep
+from multiprocessing.pool import Pool, AsyncResult
+from multiprocessing.sharedctypes import SynchronizedArray
+
+import numpy
+
+from Classes.TileCache import TileCache, TILE_CACHE_BUDGET
+from Scripts.WorkerUtilities import WORKERS, EXPLICIT_WORKERS, PROGRESSIVE_SCALES, TOKEN_SLOTS, CANCELLED, new_tokens, \
+    start_pool, zoom_level, visible_tiles, submit_tiles, collect_tiles, submit_explicit, block_names, free_block, \
+    free_blocks
+from Scripts.VectorUtilities import join_polylines
+from Scripts.TraceUtilities import start_render, finish_render
+
+CLOSE_TIMEOUT: float = 1  # Seconds to wait for the tiles workers already started when closing
+
+
+class TileRenderer:
+    """
+    Renders implicit relations tile by tile on the worker pool
+    Tiles are cached, so a pan only renders the tiles that scrolled into view and returning to a view is free
+    Tiles are rendered progressively, each pass at a finer scale of PROGRESSIVE_SCALES reuses the last one's lattice
+    Every pass carries a generation number, a newer request cancels the tiles the workers haven't started,
+    and the tiles they did finish are still cached
+    Explicit functions are sampled and clipped on a pool of their own, so they never wait behind the tiles of relations,
+    only their strokes are drawn on the main thread
+    Passes are queued and handed to the pool by dispatch, so any number of functions share the workers fairly,
+    passes of hidden functions wait until they are shown and listed functions go first
+    """
+    def __init__(self, functions: int, workers: int = WORKERS, budget: int = TILE_CACHE_BUDGET):
+        self.tokens: SynchronizedArray = new_tokens()
+        self.workers: int = max(workers, 1)
+        self.pool: Pool = start_pool(self.workers, self.tokens)
+        self.explicit_pool: Pool = start_pool(EXPLICIT_WORKERS, self.tokens)
+        self.cache: TileCache = TileCache(budget)
+        self.generation: int = 0  # Last generation handed out
+        self.order: count = count()  # Numbers queued passes, so equal passes are dispatched oldest first
+        self.views: list[list[tuple]] = [[] for _ in range(functions)]  # Keys of the tiles each function shows
+        # Result, keys, scale and block names of the pass each function is waiting for,
+        # keys are None for explicit functions, which keep their arguments instead of block names
+        self.jobs: list[None | tuple[AsyncResult, list[tuple] | None, int, list[str] | tuple]] = \
+            [None for _ in range(functions)]
+        self.slots: list[int | None] = [None for _ in range(functions)]  # Token slot each function's pass holds
+        self.free_slots: list[int] = list(range(TOKEN_SLOTS - 1, -1, -1))  # Token slots no running pass holds
+        # Vertices and stroke starts of each explicit function's last render, see explicit_strokes
+        self.strokes: list[None | tuple[numpy.ndarray, list[int]]] = [None for _ in range(functions)]
+        # Order, keys, scale and seeds or explicit arguments of the pass each function waits to dispatch
+        self.queued: list[None | tuple[int, list[tuple] | None, int, list | tuple]] = [None for _ in range(functions)]
+        self.shown: list[bool] = [True for _ in range(functions)]  # Functions whose layers are drawn, see show
+        self.listed: range = range(functions)  # Functions whose boxes are scrolled into view
+        self.partial: dict = {}  # Key: (scale, packed polylines, shared lattice) of tiles still being refined
+        self.stale: list[tuple] = []  # Superseded passes, stored once they finish
+
+    def add_function(self) -> None:
+        self.views.append([])
+        self.jobs.append(None)
+        self.slots.append(None)
+        self.strokes.append(None)
+        self.queued.append(None)
+        self.shown.append(True)
+        return None
+
+    def show(self, idx: int, shown: bool) -> None:
+        """
+        Hides or shows a function, a hidden function's queued passes wait and its running ones finish
+        """
+        self.shown[idx] = shown
+        return None
+
+    def request(self, idx: int, equation: tuple[str, str], m: float, n: float,
+                x_bounds, y_bounds, resolution) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Shows a relation over new bounds, rendering any tiles that aren't cached
+        Returns the packed polylines of the cached tiles, which can be drawn straight away
+        """
+        zoom: tuple[float, float, int] = zoom_level(x_bounds, y_bounds, resolution)
+        view: list[tuple] = [(equation, m, n, zoom, tile) for tile in visible_tiles(x_bounds, y_bounds, zoom)]
+        if view == self.views[idx] and self.busy(idx):  # Already being rendered
+            return self.visible(idx)
+        if view != self.views[idx]:  # Redraws of the same view aren't timed
+            start_render(idx)
+        self.views[idx] = view
+        self.strokes[idx] = None
+        self.discard(idx)
+        # Forget the passes of tiles no function shows any more
+        shown: set = {key for keys in self.views for key in keys}
+        for key in [key for key in self.partial if key not in shown]:
+            self.forget(key)
+        self.submit(idx, [key for key in view if key not in self.cache])
+        if not self.busy(idx):  # Every tile was cached
+            finish_render(idx)
+        return self.visible(idx)
+
+    def request_explicit(self, idx: int, equation: tuple[str, str], x_bounds, y_bounds, resolution) -> None:
+        """
+        Queues an explicit function to be sampled over new bounds, its strokes are kept once poll finds them ready
+        """
+        start_render(idx)
+        self.views[idx] = []
+        self.strokes[idx] = None
+        self.discard(idx)
+        self.queued[idx] = next(self.order), None, 1, (equation, x_bounds, y_bounds, resolution)
+        return None
+
+    def submit(self, idx: int, keys: list[tuple]) -> None:
+        """
+        Queues the next pass of tiles, tiles that haven't had a pass yet are started first
+        """
+        if not keys:
+            return None
+        scales: list[int] = [self.partial[key][0] if key in self.partial else 0 for key in keys]
+        # Finish one scale at a time, starting with the coarsest still needed
+        current: int = min(scales, key=lambda scale: PROGRESSIVE_SCALES.index(scale) if scale else -1)
+        scale: int = PROGRESSIVE_SCALES[PROGRESSIVE_SCALES.index(current) + 1 if current else 0]
+        keys = [key for key, tile_scale in zip(keys, scales) if tile_scale == current]
+        seeds: list = [self.partial[key][2] if key in self.partial else None for key in keys]
+        self.queued[idx] = next(self.order), keys, scale, seeds
+        return None
+
+    def priority(self, idx: int) -> tuple[int, bool, int]:
+        """
+        Explicit functions go first, so a full set of running relations never holds them back,
+        then passes of relations from the coarsest, so every relation is previewed before any is refined,
+        and among equals, listed functions first, then the oldest first
+        """
+        order, keys, scale, _ = self.queued[idx]
+        return (-1 if keys is None else PROGRESSIVE_SCALES.index(scale)), idx not in self.listed, order
+
+    def dispatch(self) -> None:
+        """
+        Hands the queued passes to the pools under new generations, by priority
+        At most one pass of a relation per worker runs at once, so a new request never waits behind a long queue
+        Every running pass holds a token slot of its own, passes wait in the queue while none is free
+        Passes of hidden functions are left queued
+        """
+        running: int = sum(job is not None and job[1] is not None for job in self.jobs)
+        waiting: list[int] = [i for i, queued in enumerate(self.queued) if queued is not None and self.shown[i]]
+        for idx in sorted(waiting, key=self.priority):
+            _, keys, scale, arguments = self.queued[idx]
+            if not self.free_slots:
+                break
+            if keys is not None and running >= self.workers:  # Every later pass is a relation's too
+                break
+            self.queued[idx] = None
+            self.generation += 1
+            self.slots[idx] = self.free_slots.pop()
+            self.tokens[self.slots[idx]] = self.generation
+            token: tuple[int, int] = self.slots[idx], self.generation
+            if keys is None:
+                self.jobs[idx] = submit_explicit(self.explicit_pool, *arguments, token), None, 1, arguments
+            else:
+                names: list[str] = block_names(self.generation, len(keys))
+                result: AsyncResult = submit_tiles(self.pool, self.workers, keys[0][0], keys[0][3],
+                                                   [key[4] for key in keys], names, scale, arguments, token)
+                self.jobs[idx] = result, keys, scale, names
+                running += 1
+        return None
+
+    def store(self, job: tuple[AsyncResult, list[tuple], int, list[str]]) -> bool:
+        """
+        Caches the finished tiles of a pass, tiles that were cancelled are skipped
+        Returns False if the pass failed, every block its tiles wrote is freed
+        """
+        result, keys, scale, names = job
+        try:
+            tiles: list = collect_tiles(result)
+        except Exception:  # Whatever a worker raised, e.g. MemoryError, RecursionError or an unpicklable result
+            free_blocks(names)
+            for key in keys:
+                self.forget(key)
+            return False
+        for key, tile in zip(keys, tiles):
+            if tile is None:
+                continue
+            polylines, lattice = tile
+            if key in self.cache or key in self.partial and self.partial[key][0] <= scale:  # Nothing new
+                if lattice is not None:
+                    free_block(lattice[0])
+            elif scale == 1:  # Finished
+                self.cache.put(key, polylines)
+                self.forget(key)
+            else:
+                self.forget(key)
+                self.partial[key] = scale, polylines, lattice
+        return True
+
+    def release(self, idx: int) -> None:
+        """
+        Returns the token slot of a function's pass once it finished or was cancelled
+        """
+        if self.slots[idx] is not None:
+            self.free_slots.append(self.slots[idx])
+            self.slots[idx] = None
+        return None
+
+    def forget(self, key: tuple) -> None:
+        """
+        Drops a tile's coarser pass, freeing its lattice
+        """
+        if key in self.partial:
+            free_block(self.partial.pop(key)[2][0])
+        return None
+
+    def visible(self, idx: int) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Packed polylines of every cached tile in a function's view
+        """
+        packed: list[tuple[numpy.ndarray, numpy.ndarray]] = []
+        for key in self.views[idx]:
+            if key in self.cache:
+                packed.append(self.cache.get(key))
+            elif key in self.partial:
+                packed.append(self.partial[key][1])
+        return join_polylines(packed)
+
+    def poll(self, idx: int) -> bool:
+        """
+        Stores the tiles of a finished pass and queues the next one
+        Returns True if a pass finished since the last poll, so the graph should be redrawn
+        An explicit function the worker skipped is queued again rather than drawn empty
+        """
+        if self.jobs[idx] is None or not self.jobs[idx][0].ready():
+            return False
+        job = self.jobs[idx]
+        self.jobs[idx] = None
+        self.release(idx)
+        if job[1] is None:  # Explicit function, rendered in one go
+            try:
+                strokes: tuple[numpy.ndarray, list[int]] | None = job[0].get()
+            except Exception:  # As in store, the function is drawn empty
+                strokes = numpy.empty((0, 2)), []
+            if strokes is None:  # Its token no longer matched, nothing was sampled
+                self.queued[idx] = next(self.order), None, 1, job[3]
+                return False
+            self.strokes[idx] = strokes
+        elif self.store(job):
+            self.submit(idx, [key for key in self.views[idx] if key not in self.cache])
+        if not self.busy(idx):
+            finish_render(idx)
+        return True
+
+    def busy(self, idx: int | None = None) -> bool:
+        """
+        If a function has a pass running or queued, or if any function is being rendered,
+        which hidden functions with only queued passes aren't, as nothing is done for them until they are shown
+        """
+        if idx is None:
+            return any(job is not None for job in self.jobs) or \
+                any(queued is not None and shown for queued, shown in zip(self.queued, self.shown))
+        return self.jobs[idx] is not None or self.queued[idx] is not None
+
+    def discard(self, idx: int | None = None) -> None:
+        """
+        Cancels a function's render, or every render, workers skip the tiles they haven't started
+        """
+        for i in range(len(self.jobs)) if idx is None else (idx,):
+            self.queued[i] = None
+            if self.jobs[i] is not None:
+                self.tokens[self.slots[i]] = CANCELLED
+                self.release(i)
+                self.stale.append(self.jobs[i])
+                self.jobs[i] = None
+        return None
+
+    def collect_stale(self) -> None:
+        """
+        Keeps the finished tiles of cancelled passes, they are still valid for any view showing them
+        """
+        for job in [job for job in self.stale if job[0].ready()]:
+            self.stale.remove(job)
+            if job[1] is not None:  # Superseded explicit renders are of no use to any view
+                self.store(job)
+        return None
+
+    def close(self, timeout: float = CLOSE_TIMEOUT) -> None:
+        """
+        Cancels every render, waits up to timeout for the tiles the workers already started, then stops the workers,
+        so a relation that is slow to evaluate can't hold up quitting
+        Every shared block is freed, including those of tiles stopped halfway
+        """
+        self.discard()
+        self.pool.close()
+        self.explicit_pool.close()
+        deadline: float = perf_counter() + timeout
+        while any(not job[0].ready() for job in self.stale) and perf_counter() < deadline:
+            sleep(0.01)
+        for pool in self.pool, self.explicit_pool:
+            pool.terminate()
+            pool.join()
+        self.collect_stale()
+        for job in self.stale:  # Never finished
+            if job[1] is not None:
+                free_blocks(job[3])
+        self.stale.clear()
+        for key in list(self.partial):
+            self.forget(key)
+        return None
@@ -0,0 +1,101 @@
+from collections import OrderedDict
+from multiprocessing import get_context
+from multiprocessing.pool import Pool, AsyncResult
+from time import perf_counter
+
+from Scripts.GraphUtilities import check_equation
+
+VALIDATE_DELAY: float = 0.15  # Seconds a box's text must stay unchanged before it is checked
+VALIDATE_TIMEOUT: float = 1  # Seconds a check may run before the worker is restarted
+VALIDATE_CACHE: int = 256  # Results kept, keyed by (text, $m, $n)
+TIMED_OUT: int = 6  # Error code of an equation whose check took too long, e.g. a huge power
+
+
+class Validator:
+    """
+    Checks the equations typed into the function boxes on a worker process, see check_equation,
+    so the main loop never runs the maths in them
+    A box is checked once its text stops changing, every result is cached per text,
+    and a check that runs too long is abandoned by restarting the worker
+    """
+    def __init__(self, delay: float = VALIDATE_DELAY, timeout: float = VALIDATE_TIMEOUT,
+                 cache_size: int = VALIDATE_CACHE):
+        self.delay: float = delay
+        self.timeout: float = timeout
+        self.cache_size: int = cache_size
+        self.results: OrderedDict = OrderedDict()  # (text, $m, $n): result of check_equation
+        self.pending: dict[int, tuple[tuple, float]] = {}  # Box index: key to check and when its text last changed
+        self.pool: Pool | None = None
+        self.job: tuple[AsyncResult, tuple | None, float] | None = None  # Check running, its key and start
+        self.start()
+
+    def start(self) -> None:
+        """
+        Starts the worker, the first check warms it up and is never timed out,
+        so a slow start isn't mistaken for a slow equation
+        """
+        self.pool = get_context("spawn").Pool(processes=1)
+        self.job = self.pool.apply_async(check_equation, ("y = x", 0, 0)), None, float("inf")
+        return None
+
+    def check(self, idx: int, text: str, m: float, n: float, wait: bool = True) -> tuple | None:
+        """
+        The cached result of check_equation for a box's text, or None while it is still being checked
+        Unless wait is False, the check only starts once the text hasn't changed for delay seconds
+        """
+        key: tuple = text, m, n
+        if key in self.results:
+            self.results.move_to_end(key)
+            return self.results[key]
+        if not wait:
+            self.pending[idx] = key, 0
+        elif idx not in self.pending or self.pending[idx][0] != key:  # Typed into, wait again
+            self.pending[idx] = key, perf_counter()
+        return None
+
+    def poll(self) -> bool:
+        """
+        Stores a finished check and starts the next one that is due, restarting the worker if a check ran too long
+        Returns True if a result arrived since the last poll
+        """
+        arrived: bool = False
+        if self.job is not None:
+            result, key, start = self.job
+            if result.ready():
+                try:
+                    equation = result.get()
+                except Exception:  # Whatever the check raised, e.g. IndexError from m = [][1], is invalid
+                    equation = None, 4, None
+                if key is not None:
+                    self.store(key, equation)
+                    arrived = True
+                self.job = None
+            elif perf_counter() - start > self.timeout:
+                self.pool.terminate()
+                self.start()
+                self.store(key, (None, TIMED_OUT, None))
+                arrived = True
+
+        # Forget boxes whose text has been checked, then start the longest waiting of the rest
+        self.pending = {idx: (key, changed) for idx, (key, changed) in self.pending.items() if key not in self.results}
+        if self.job is None and self.pending:
+            key, changed = min(self.pending.values(), key=lambda pending: pending[1])
+            if perf_counter() - changed >= self.delay:
+                self.job = self.pool.apply_async(check_equation, key), key, perf_counter()
+        return arrived
+
+    def store(self, key: tuple, result: tuple) -> None:
+        self.results[key] = result
+        while len(self.results) > self.cache_size:
+            self.results.popitem(last=False)
+        return None
+
+    def busy(self) -> bool:
+        return self.job is not None or bool(self.pending)
+
+    def close(self) -> None:
+        """
+        Stops the worker without waiting for a check still running
+        """
+        self.pool.terminate()
+        return None
@@ -0,0 +1,147 @@
+from os import path, environ, chdir, cpu_count
+from sys import exit, stderr
+from multiprocessing import Pool, freeze_support
+from argparse import ArgumentParser
+from json import load
+from contextlib import redirect_stdout
+
+environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Render without opening a window
+with redirect_stdout(None):
+    import pygame
+
+from Classes.Grapher import Grapher
+from Classes.Text import Text
+from Scripts.ImplicitUtilities import implicit_polylines
+from Scripts.VectorUtilities import pack_polylines
+
+BG_COLOR: tuple = (240, 240, 240)
+LINE_WIDTH: int = 1
+LINE_COLORS: tuple = (255, 0, 0), (12, 168, 48), (12, 64, 255), (128, 48, 128)
+
+# Defaults of a job, the same as the graph window's
+DEFAULT_JOB: dict = {
+    "equations": [], "bounds": (-10, 10, -10, 10), "resolution": (300, 300), "colors": [], "m": 0, "n": 0
+}
+
+
+def start_worker() -> None:
+    """
+    Runs once in every process, so PyGame and the graph's font are only loaded once however many jobs it renders
+    """
+    chdir(path.dirname(path.abspath(__file__)))  # Assets are loaded relative to the project
+    with redirect_stdout(None):
+        pygame.init()
+    return None
+
+
+def parse_color(color: str | list) -> tuple:
+    """
+    Reads a color written as "#rrggbb", "r,g,b" or a list of numbers
+    """
+    if isinstance(color, str):
+        if color.startswith('#'):
+            return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+        return tuple(int(channel) for channel in color.split(','))
+    return tuple(color)
+
+
+def render_job(job: dict) -> tuple[str, list[str]]:
+    """
+    Draws every equation of a job onto an off-screen graph and saves it as a PNG
+    Returns the output path and an error message for each equation that couldn't be drawn
+    """
+    job = dict(DEFAULT_JOB, **job)
+    resolution: tuple[int, int] = tuple(job["resolution"])
+    x_bounds: tuple = float(job["bounds"][0]), float(job["bounds"][1])
+    y_bounds: tuple = float(job["bounds"][2]), float(job["bounds"][3])
+    colors: list = [parse_color(color) for color in job["colors"]] or list(LINE_COLORS)
+
+    surface: pygame.Surface = pygame.Surface((resolution[0] + 2 * LINE_WIDTH, resolution[1] + 2 * LINE_WIDTH))
+    grapher: Grapher = Grapher(surface, resolution, (0, 0), x_bounds, y_bounds)
+    grapher.m, grapher.n = job["m"], job["n"]
+    indicator: Text = Text(surface, "", 1, BG_COLOR, (-1, -1))  # Nothing to show progress on
+
+    errors: list[str] = []
+    drawn: int = 0  # Equations given a color so far, assignments to $m and $n aren't drawn
+    for equation in job["equations"]:
+        valid_prompt: tuple[tuple, int] = grapher.validate_equation(equation)
+        if valid_prompt[1] in (10, 11):  # Assigned $m or $n for the following equations
+            continue
+        if not valid_prompt[0]:
+            errors.append(f"{equation!r} is invalid (error {valid_prompt[1]})")
+            continue
+        lhs, rhs = valid_prompt[0]
+        color: tuple = colors[drawn % len(colors)]
+        drawn += 1
+        if lhs == "(y)" and 'y' not in rhs or lhs == "(x)" and 'x' not in rhs:
+            grapher.function_graph(valid_prompt[0], indicator, color, LINE_WIDTH)
+        else:
+            grapher.graph_points[0] = pack_polylines(implicit_polylines(valid_prompt[0], x_bounds, y_bounds,
+                                                                        resolution))
+            grapher.draw_graph(0, color, LINE_WIDTH, animate=False)
+
+    grapher.composite()
+    pygame.image.save(surface, job["output"])
+    return job["output"], errors
+
+
+def read_jobs(arguments) -> list[dict]:
+    """
+    Collects the jobs from a JSON file, a list of job objects, and from the command line
+    """
+    jobs: list[dict] = []
+    if arguments.jobs:
+        with open(arguments.jobs) as file:
+            jobs += load(file)
+    if arguments.equations:
+        jobs.append({"equations": arguments.equations, "output": arguments.output})
+        for key in ("bounds", "resolution", "colors", 'm', 'n'):
+            if getattr(arguments, key) is not None:
+                jobs[-1][key] = getattr(arguments, key)
+    for number, job in enumerate(jobs):
+        job.setdefault("output", f"graph_{number}.png")
+        job["output"] = path.abspath(job["output"])  # Workers run from the project's directory
+    return jobs
+
+
+def main() -> int:
+    parser = ArgumentParser(description="Renders graphs to PNG files without opening a window")
+    parser.add_argument("equations", nargs='*', help="equations of one graph, e.g. \"y = x^2\" \"x^2 + y^2 = 4\"")
+    parser.add_argument("-o", "--output", default="graph.png", help="PNG file of the graph given on the command line")
+    parser.add_argument("-b", "--bounds", nargs=4, type=float, metavar=("LEFT", "RIGHT", "LOWER", "UPPER"))
+    parser.add_argument("-r", "--resolution", nargs=2, type=int, metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("-c", "--colors", nargs='+', help="line colors as #rrggbb or r,g,b, one per equation")
+    parser.add_argument("-m", type=float, help="value of $m")
+    parser.add_argument("-n", type=float, help="value of $n")
+    parser.add_argument("-j", "--jobs", help="JSON file holding a list of jobs, each with the keys \"equations\", "
+                                             "\"output\", and optionally \"bounds\", \"resolution\", \"colors\", "
+                                             "\"m\" and \"n\"")
+    parser.add_argument("-w", "--workers", type=int, default=cpu_count() or 1, help="processes rendering jobs")
+    arguments = parser.parse_args()
+
+    jobs: list[dict] = read_jobs(arguments)
+    if not jobs:
+        parser.error("no equations or jobs file given")
+
+    workers: int = max(min(arguments.workers, len(jobs)), 1)
+    failed: bool = False
+    if workers == 1:
+        start_worker()
+        results = map(render_job, jobs)
+    else:
+        pool = Pool(processes=workers, initializer=start_worker)
+        results = pool.imap_unordered(render_job, jobs, chunksize=max(len(jobs) // (4 * workers), 1))
+    for output, errors in results:
+        print(output)
+        for error in errors:
+            print(f"{output}: {error}", file=stderr)
+        failed |= bool(errors)
+    if workers > 1:
+        pool.close()
+        pool.join()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    freeze_support()  # Fixes problems with multiprocessing module
+    exit(main())
@@ -0,0 +1,154 @@
+from os import environ, path, chdir, cpu_count
+from sys import version, stdout, stderr
+from time import perf_counter, strftime
+from statistics import median
+from platform import platform
+from subprocess import run, DEVNULL
+from argparse import ArgumentParser
+from json import dump
+from contextlib import redirect_stdout
+
+environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Benchmark without opening a window
+with redirect_stdout(None):
+    import pygame
+import numpy
+
+from Classes.Grapher import Grapher
+from Classes.Text import Text
+from Scripts.GraphUtilities import format_equation, compile_expression, compile_equation, check_equation, \
+    test_for_intercept, generate_plot_points, generate_iterative_plots
+from Scripts.ImplicitUtilities import implicit_polylines
+from Scripts.NumberUtilities import d_round, nice_ticks, tick_labels
+from Scripts.WorkerUtilities import WORKERS, start_pool
+
+# Fixed equations every run is measured on, so results can be compared between commits
+CORPUS: dict = {
+    "polynomial": ["y = -x^3", "y = x(x + 1)(x - 2)", "y = x^4 - 5x^2 + 4", "x = y^2 - 3"],
+    "trig": ["y = sinx", "y = 10sinx/x", "y = sin(5x)cos(x)", "x = 2cos(y)"],
+    "asymptotic": ["y = 1/x", "y = tanx", "y = 1/(x^2 - 1)", "y = log(x)"],
+    "implicit conics": ["x^2 + y^2 = 25", "x^2/16 + y^2/9 = 1", "x^2 - y^2 = 4", "xy = 1"]
+}
+RESOLUTIONS: tuple = (300, 300), (1000, 1000), (2000, 2000)
+BOUNDS: tuple = (-10, 10), (-10, 10)
+POINT_BY_POINT_LIMIT: int = 300 * 300  # Largest graph generate_plot_points is run on, it tests every pixel in Python
+D_ROUND_VALUES: tuple = 0, 1E-7, 0.05, 0.5, 1.25, 3.14159, -7.5, 42, 1234.5678, -98765.4321, 1E6, 2.5E-4
+TICK_BOUNDS: tuple = (-10, 10), (-0.05, 0.05), (-3E5, 1E5), (1E6, 1E6 + 1E-3)  # Including a tiny range far from 0
+
+
+def measure(function, repeats: int) -> dict:
+    """
+    Runs a function once to warm up, then times it, returning the times in milliseconds
+    """
+    function()
+    times: list[float] = []
+    for _ in range(repeats):
+        start: float = perf_counter()
+        function()
+        times.append((perf_counter() - start) * 1000)
+    return {"repeats": repeats, "min_ms": min(times), "median_ms": median(times), "mean_ms": sum(times) / repeats}
+
+
+def commit() -> str | None:
+    result = run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, stdin=DEVNULL)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def is_function(equation: tuple[str, str]) -> bool:
+    """
+    Whether a formatted equation is a y or x function, rather than a relation
+    """
+    return equation[0] == "(y)" and 'y' not in equation[1] or equation[0] == "(x)" and 'x' not in equation[1]
+
+
+def uncached_check(equation: str) -> tuple:
+    """
+    check_equation with every parse and compile cache emptied first, so a whole validation is measured
+    """
+    format_equation.cache_clear()
+    compile_expression.cache_clear()
+    compile_equation.cache_clear()
+    return check_equation(equation, 0, 0)
+
+
+def run_benchmarks(resolutions: tuple, repeats: int, pool) -> list[dict]:
+    results: list[dict] = []
+
+    def record(name: str, function, resolution: tuple | None = None, equation: str | None = None,
+               category: str | None = None, times: int = repeats) -> None:
+        results.append(dict(name=name, category=category, equation=equation,
+                            resolution=list(resolution) if resolution else None, **measure(function, times)))
+        print(f"{name:<22} {str(resolution or ''):<14} {equation or '':<22} {results[-1]['median_ms']:10.3f} ms",
+              file=stderr)
+        return None
+
+    # Uncached, so the formatting itself is measured
+    record("d_round", lambda: [d_round.__wrapped__(value, places) for value in D_ROUND_VALUES for places in range(4)])
+    record("tick_labels", lambda: [tick_labels(*nice_ticks(bounds, 24)) for bounds in TICK_BOUNDS])
+    for category, equations in CORPUS.items():
+        for equation in equations:
+            # Uncached, so the parse itself is measured
+            record("format_equation", lambda: format_equation.__wrapped__(equation, 0, 0), None, equation, category)
+            record("check_equation", lambda: uncached_check(equation), None, equation, category)
+
+    for resolution in resolutions:
+        surface: pygame.Surface = pygame.Surface((resolution[0] + 2, resolution[1] + 2))
+        grapher: Grapher = Grapher(surface, resolution, (0, 0), *BOUNDS)
+        indicator: Text = Text(surface, "", 1, (240, 240, 240), (-1, -1))
+        record("clear_graph", grapher.clear_graph, resolution)
+
+        for category, equations in CORPUS.items():
+            for equation in equations:
+                formatted: tuple[str, str] = grapher.validate_equation(equation)[0]
+                if is_function(formatted):
+                    record("function_graph", lambda: grapher.function_graph(formatted, indicator, (255, 0, 0), 1),
+                           resolution, equation, category)
+                    continue
+
+                record("implicit_polylines", lambda: implicit_polylines(formatted, *BOUNDS, resolution),
+                       resolution, equation, category)
+                ranges: tuple = BOUNDS[0][1] - BOUNDS[0][0], BOUNDS[1][1] - BOUNDS[1][0]
+                tolerances: tuple = ranges[0] / resolution[0] * 0.5, ranges[1] / resolution[1] * 0.5
+                record("test_for_intercept",
+                       lambda: test_for_intercept((*formatted, (1.0, 1.0), *tolerances)), resolution, equation,
+                       category)
+                if resolution[0] * resolution[1] <= POINT_BY_POINT_LIMIT:
+                    info_packs: tuple = generate_iterative_plots(formatted, *BOUNDS, ranges, resolution)
+                    record("generate_plot_points", lambda: generate_plot_points(info_packs, pool, WORKERS), resolution,
+                           equation, category, times=max(repeats // 5, 1))
+    return results
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Times the graphing functions over a fixed corpus of equations")
+    parser.add_argument("-o", "--output", help="JSON file to write the results to, printed if not given")
+    parser.add_argument("-n", "--repeats", type=int, default=10, help="timed runs of each benchmark")
+    parser.add_argument("-r", "--resolutions", nargs='+', type=int, metavar="SIZE",
+                        default=[resolution[0] for resolution in RESOLUTIONS], help="square graph sizes in pixels")
+    arguments = parser.parse_args()
+    output: str | None = path.abspath(arguments.output) if arguments.output else None
+
+    chdir(path.dirname(path.abspath(__file__)))  # Assets are loaded relative to the project
+    with redirect_stdout(None):
+        pygame.init()
+    pool = start_pool()
+    try:
+        results: list[dict] = run_benchmarks(tuple((size, size) for size in arguments.resolutions),
+                                             max(arguments.repeats, 1), pool)
+    finally:
+        pool.terminate()
+
+    report: dict = {
+        "commit": commit(), "time": strftime("%Y-%m-%dT%H:%M:%S%z"), "python": version, "numpy": numpy.__version__,
+        "pygame": pygame.version.ver, "platform": platform(), "cpus": cpu_count(), "repeats": arguments.repeats,
+        "results": results
+    }
+    if output:
+        with open(output, 'w') as file:
+            dump(report, file, indent=2)
+    else:
+        dump(report, stdout, indent=2)
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,6 @@
 from os import path, mkdir
 from sys import exit
-from multiprocessing import freeze_support, Process, Manager
-from threading import Thread
-from copy import deepcopy
+from multiprocessing import freeze_support
 from time import time, localtime, asctime
 from contextlib import redirect_stdout
 with redirect_stdout(None):
@@ -13,7 +11,12 @@ from Classes.CheckBox import CheckBox
 from Classes.InputBox import InputBox
 from Classes.Grapher import Grapher
 from Classes.Text import Text
-from Scripts.GraphUtilities import generate_iterative_plots, generate_plot_points
+from Classes.TileRenderer import TileRenderer
+from Classes.Validator import Validator, TIMED_OUT
+from Classes.PerformanceOverlay import PerformanceOverlay
+from Scripts.WorkerUtilities import WORKERS
+from Scripts.DisplayUtilities import flush, mark_all, mark_dirty, line_color
+from Scripts.TraceUtilities import span, begin_frame, end_frame, dump_chrome_trace, start_profile
 
 if __name__ == "__main__":
     _TITLE: str = "GraphCalc"
@@ -48,6 +51,7 @@ for function in ["sin", "cos", "tan", "sec", "csc", "cot", "asin", "acos", "atan
 WIN_RES: tuple[int, int] = (450, 650)
 
 TICK: int = 120  # Refresh rate
+IDLE_TIMEOUT: int = 250  # Milliseconds to wait for an event when nothing is changing, instead of ticking
 
 # Colors
 BG_COLOR: tuple = (240, 240, 240)
@@ -60,12 +64,16 @@ INV_FUNC_COLOR: tuple = (0, 0, 0)
 
 FUNC_TEXT_SIZE: int = 12
 BOUND_TEXT_SIZE: int = 10
+OVERLAY_TEXT_SIZE: int = 9
 
 # Graph variables
 GRAPH_RES: tuple[int, int] = 300, 300
 GRAPH_POS: tuple[int, int] = int((WIN_RES[0] - GRAPH_RES[0]) * 0.5), 40
 LINE_WIDTH: int = 1
-LINE_COLORS: tuple = (255, 0, 0), (12, 168, 48), (12, 64, 255), (128, 48, 128)
+LINE_COLORS: tuple = (255, 0, 0), (12, 168, 48), (12, 64, 255), (128, 48, 128)  # Of the first functions
+FUNCTION_ROWS: int = 4  # Function boxes shown at once, the boxes scroll through the rest of the functions
+CAPTURE_NAME: int = 180  # Characters of the equations kept in a graph capture's filename
+RENDER_WORKERS: int = WORKERS  # Processes rendering implicit relations, defaults to one per CPU
 
 # Placeholders for elements
 grapher: Grapher
@@ -87,24 +95,17 @@ indicators: tuple
 func_errors: tuple
 enablers: tuple
 funcs: tuple
+function_area: pygame.Rect
 inserts: tuple
 insert_label1: Text
 insert_label2: Text
 
 # Store the text that will be drawn when changing resolution
-dce_texts: tuple = ("-10", "10", "-10", "10", True, False, False, False, "y = -x^3", "y = x(x + 1)(x - 2)", "", "")
-
-
-def iterative_points(equation: tuple[str, str], x_bounds, y_bounds, ranges, resolution, mang_dict, idx) -> None:
-    """
-    Auxiliary function to allow iterative graphs to be generated in a process rather than a thread
-    """
-    # Generate information for computation of plotted points
-    # i.e. equation, coordinates to be iterated, tolerances
-    info_packs: tuple[tuple] = generate_iterative_plots(equation, x_bounds, y_bounds, ranges, resolution)
-    graph_points = generate_plot_points(info_packs)
-    mang_dict[idx] = graph_points
-    return None
+dce_texts: tuple = ("-10", "10", "-10", "10")
+# Every function's equation and if it is enabled, the boxes show FUNCTION_ROWS of them from func_scroll
+func_texts: list[str] = ["y = -x^3", "y = x(x + 1)(x - 2)", "", ""]
+func_on: list[bool] = [True, False, False, False]
+func_scroll: int = 0
 
 
 def graph_capture(app_window: pygame.Surface) -> None:
@@ -114,9 +115,9 @@ def graph_capture(app_window: pygame.Surface) -> None:
     screenshot: pygame.Surface = app_window.subsurface(pygame.Rect(GRAPH_POS, GRAPH_RES))
     
     enabled_func_texts: list[str] = []
-    for func, enabler in zip(funcs, enablers):
-        enabled_func_texts.append(func.text.replace(' ', "") if enabler.on else "")
-    filename: str = ";".join(enabled_func_texts)
+    for func_text, on in zip(func_texts, func_on):
+        enabled_func_texts.append(func_text.replace(' ', "") if on else "")
+    filename: str = ";".join(enabled_func_texts)[:CAPTURE_NAME]
     filename += "_on_" + asctime(localtime(time()))[4:].replace(' ', '_').replace(':', '.')
     filename = filename.replace('/', "\\")
 
@@ -136,13 +137,13 @@ def graph_config_window() -> None:
     def draw_config_elements() -> None:
         global grapher, res_box_x, res_box_y, res_error, graph_buttons, clicksel_prompt, render_button, \
             bound_labels, bounds, left_bound, right_bound, lower_bound, upper_bound, bound_errors, \
-            func_labels, indicators, func_errors, enablers, funcs, inserts, insert_label1, insert_label2
+            inserts, insert_label1, insert_label2
         """
         Draws all of the GUI elements, used when changing resolution
         """
         graph_border: pygame.Rect = pygame.Rect((0, 0), (WIN_RES[0], GRAPH_RES[1] + 105))
         grapher = Grapher(window=window, resolution=GRAPH_RES, pos=GRAPH_POS,
-                          x_range=(-10, 10), y_range=(-10, 10))
+                          x_range=(-10, 10), y_range=(-10, 10), functions=len(func_texts))
         render_button = SpriteButton(window, (int(WIN_RES[0] * 0.5) - 50, WIN_RES[1] - 45), (100, 30), "enter",
                                      BRIGHT_COLOR, 18, render_normal, render_hover)
         
@@ -213,64 +214,6 @@ def graph_config_window() -> None:
                                  (int(WIN_RES[0] * 0.5) + 35, GRAPH_POS[1] - 20))
         bound_errors = left_error, right_error, lower_error, upper_error
         
-        func1_label: Text = Text(window, "Function 1:", FUNC_TEXT_SIZE, TEXT_COLOR,
-                                 (int(WIN_RES[0] * 0.5) - 220, WIN_RES[1] - 240))
-        func2_label: Text = Text(window, "Function 2:", FUNC_TEXT_SIZE, TEXT_COLOR,
-                                 (int(WIN_RES[0] * 0.5) - 220, WIN_RES[1] - 190))
-        func3_label: Text = Text(window, "Function 3:", FUNC_TEXT_SIZE, TEXT_COLOR,
-                                 (int(WIN_RES[0] * 0.5) - 220, WIN_RES[1] - 140))
-        func4_label: Text = Text(window, "Function 4:", FUNC_TEXT_SIZE, TEXT_COLOR,
-                                 (int(WIN_RES[0] * 0.5) - 220, WIN_RES[1] - 90))
-        func_labels = func1_label, func2_label, func3_label, func4_label
-        
-        indicator1: Text = Text(window, "Rendering...", FUNC_TEXT_SIZE, LINE_COLORS[0],
-                                (int(WIN_RES[0] * 0.5) - 135, WIN_RES[1] - 240))
-        indicator2: Text = Text(window, "Rendering...", FUNC_TEXT_SIZE, LINE_COLORS[1],
-                                (int(WIN_RES[0] * 0.5) - 135, WIN_RES[1] - 190))
-        indicator3: Text = Text(window, "Rendering...", FUNC_TEXT_SIZE, LINE_COLORS[2],
-                                (int(WIN_RES[0] * 0.5) - 135, WIN_RES[1] - 140))
-        indicator4: Text = Text(window, "Rendering...", FUNC_TEXT_SIZE, LINE_COLORS[3],
-                                (int(WIN_RES[0] * 0.5) - 135, WIN_RES[1] - 90))
-        indicators = indicator1, indicator2, indicator3, indicator4
-        
-        func_error1: Text = Text(window, "Error Not Found", FUNC_TEXT_SIZE, TEXT_COLOR,
-                                 (int(WIN_RES[0] * 0.5) + 100, WIN_RES[1] - 240))
-        func_error2: Text = Text(window, "Error Not Found", FUNC_TEXT_SIZE, TEXT_COLOR,
-                                 (int(WIN_RES[0] * 0.5) + 100, WIN_RES[1] - 190))
-        func_error3: Text = Text(window, "Error Not Found", FUNC_TEXT_SIZE, TEXT_COLOR,
-                                 (int(WIN_RES[0] * 0.5) + 100, WIN_RES[1] - 140))
-        func_error4: Text = Text(window, "Error Not Found", FUNC_TEXT_SIZE, TEXT_COLOR,
-                                 (int(WIN_RES[0] * 0.5) + 100, WIN_RES[1] - 90))
-        func_errors = func_error1, func_error2, func_error3, func_error4
-        
-        enabler1: CheckBox = CheckBox(window,
-                                      (int(WIN_RES[0] * 0.5) - 220, WIN_RES[1] - 220),
-                                      18, LINE_COLORS[0], dce_texts[4])
-        enabler2: CheckBox = CheckBox(window,
-                                      (int(WIN_RES[0] * 0.5) - 220, WIN_RES[1] - 170),
-                                      18, LINE_COLORS[1], dce_texts[5])
-        enabler3: CheckBox = CheckBox(window,
-                                      (int(WIN_RES[0] * 0.5) - 220, WIN_RES[1] - 120),
-                                      18, LINE_COLORS[2], dce_texts[6])
-        enabler4: CheckBox = CheckBox(window,
-                                      (int(WIN_RES[0] * 0.5) - 220, WIN_RES[1] - 70),
-                                      18, LINE_COLORS[3], dce_texts[7])
-        enablers = enabler1, enabler2, enabler3, enabler4
-        
-        func_input1: InputBox = InputBox(window,
-                                         (int(WIN_RES[0] * 0.5) - 197, WIN_RES[1] - 220),
-                                         298, dce_texts[8], FUNC_TEXT_SIZE)
-        func_input2: InputBox = InputBox(window,
-                                         (int(WIN_RES[0] * 0.5) - 197, WIN_RES[1] - 170),
-                                         298, dce_texts[9], FUNC_TEXT_SIZE)
-        func_input3: InputBox = InputBox(window,
-                                         (int(WIN_RES[0] * 0.5) - 197, WIN_RES[1] - 120),
-                                         298, dce_texts[10], FUNC_TEXT_SIZE)
-        func_input4: InputBox = InputBox(window,
-                                         (int(WIN_RES[0] * 0.5) - 197, WIN_RES[1] - 70),
-                                         298, dce_texts[11], FUNC_TEXT_SIZE)
-        funcs = func_input1, func_input2, func_input3, func_input4
-        
         insert_label1 = Text(window, "Function", 16, TEXT_COLOR,
                              (int(WIN_RES[0] * 0.5) + 125, WIN_RES[1] - 240))
         insert_label2 = Text(window, "Inserts", 16, TEXT_COLOR,
@@ -313,38 +256,114 @@ def graph_config_window() -> None:
         render_button.draw()
         insert_label1.draw()
         insert_label2.draw()
-        for element in (res_text, res_box_x, res_box_y) + graph_buttons + bound_labels + func_labels + enablers + \
-                bounds + funcs + inserts:
+        for element in (res_text, res_box_x, res_box_y) + graph_buttons + bound_labels + bounds + inserts:
+            element.draw()
+        draw_function_rows()
+        for idx, on in enumerate(func_on):
+            grapher.show_layer(idx, on)
+        grapher.composite()
+        mark_all()
+        return None
+    
+    def draw_function_rows() -> None:
+        global func_labels, indicators, func_errors, enablers, funcs, function_area
+        """
+        Draws the boxes of the FUNCTION_ROWS functions from func_scroll, used when scrolling
+        """
+        rows: range = range(func_scroll, func_scroll + FUNCTION_ROWS)
+        func_labels = tuple(Text(window, f"Function {idx + 1}:", FUNC_TEXT_SIZE, TEXT_COLOR,
+                                 (int(WIN_RES[0] * 0.5) - 220, WIN_RES[1] - 240 + 50 * row))
+                            for row, idx in enumerate(rows))
+        indicators = tuple(Text(window, "Rendering...", FUNC_TEXT_SIZE, line_color(idx, LINE_COLORS),
+                                (int(WIN_RES[0] * 0.5) - 135, WIN_RES[1] - 240 + 50 * row))
+                           for row, idx in enumerate(rows))
+        func_errors = tuple(Text(window, "Error Not Found", FUNC_TEXT_SIZE, TEXT_COLOR,
+                                 (int(WIN_RES[0] * 0.5) + 100, WIN_RES[1] - 240 + 50 * row))
+                            for row in range(FUNCTION_ROWS))
+        enablers = tuple(CheckBox(window, (int(WIN_RES[0] * 0.5) - 220, WIN_RES[1] - 220 + 50 * row),
+                                  18, line_color(idx, LINE_COLORS), func_on[idx])
+                         for row, idx in enumerate(rows))
+        funcs = tuple(InputBox(window, (int(WIN_RES[0] * 0.5) - 197, WIN_RES[1] - 220 + 50 * row),
+                               298, func_texts[idx], FUNC_TEXT_SIZE)
+                      for row, idx in enumerate(rows))
+        
+        function_area = pygame.Rect(0, WIN_RES[1] - 245, int(WIN_RES[0] * 0.5) + 103, 200)
+        window.fill(BG_COLOR, function_area)
+        mark_dirty(function_area)
+        for element in func_labels + enablers + funcs:
             element.draw()
-        grapher.clear_graph()
+        return None
+    
+    def store_functions() -> None:
+        """
+        Copies what was typed into the boxes and their checkboxes to the functions they show
+        """
+        for row, (func_box, enabler) in enumerate(zip(funcs, enablers)):
+            func_texts[func_scroll + row] = func_box.text
+            func_on[func_scroll + row] = enabler.on
+        return None
+    
+    def scroll_functions(first: int) -> None:
+        """
+        Shows the functions from first in the boxes
+        """
+        global func_scroll
+        store_functions()
+        first = max(0, min(first, len(func_texts) - FUNCTION_ROWS))
+        if first == func_scroll:
+            return None
+        func_scroll = first
+        renderer.listed = range(func_scroll, func_scroll + FUNCTION_ROWS)  # Rendered first among equal passes
+        draw_function_rows()
+        for idx in range(func_scroll, func_scroll + FUNCTION_ROWS):
+            show_indicator(idx, renderer.busy(idx))
+        return None
+    
+    def show_indicator(idx: int, rendering: bool) -> None:
+        """
+        Shows or hides a function's rendering indicator, if its boxes are scrolled into view
+        """
+        if func_scroll <= idx < func_scroll + FUNCTION_ROWS:
+            indicators[idx - func_scroll].hide(BG_COLOR)
+            if rendering:
+                indicators[idx - func_scroll].draw()
         return None
     
     # Draw all GUI elements for first time
     draw_config_elements()
     
     mouse_cool: bool = False  # Cooldown for mouse press, only running once per click
-    old_bounds, new_bounds = tuple((0, 0) for _ in bounds), tuple((0, 0) for _ in bounds)
-    old_funcs: list = [None for _ in funcs]
     res_changed: bool = False
     in_cool, out_cool, l_cool, r_cool, d_cool, u_cool = False, False, False, False, False, False  # For graph panning
     ren_cool: bool = False  # For render button shortcut
     tab_cool: bool = False  # For textbox switching
+    page_cool: bool = False  # For scrolling the function boxes
     cap_cool: bool = False  # For saving graph as an image
+    hud_cool: bool = False  # For toggling the performance overlay
+    trace_cool: bool = False  # For saving a trace or profile of the last frames
     reset_cool: bool = False  # For resetting graph boundary
     setting_bound: bool = False  # Waiting for another click for click boundary selection
     first_corner: tuple | None = None  # Holds the window_to_graph of first click position for click boundary selection
     did_poz: bool = False  # Change render_button text if user had adjusted boundaries by moving
     
-    # Variables to hold threads, processes, and processing variables
-    render_queue: list[Thread] = []
-    proc_queue: list[None | Process] = [None for _ in funcs]
-    manager = Manager()
-    mang_dict = manager.dict()
+    # Every function and relation is rendered on the worker pool, only drawing happens in the main loop
+    renderer: TileRenderer = TileRenderer(len(func_texts), RENDER_WORKERS)
+    validator: Validator = Validator()  # Checks equations off the main loop
+    awaiting_check: bool = False  # A function wasn't drawn because its equation was still being checked
+    overlay: PerformanceOverlay = PerformanceOverlay(window, (WIN_RES[0] - 3, 2), OVERLAY_TEXT_SIZE, BRIGHT_COLOR,
+                                                     GP_BORDER_COLOR)
     
     pygame.display.update()
+    idle: bool = False  # Nothing changed last frame and nothing is being rendered
     running: bool = True
     while running:  # Main loop
-        events = pygame.event.get()
+        waited: list = []
+        if idle:  # Sleep until there is input, rather than polling every widget TICK times a second
+            event = pygame.event.wait(IDLE_TIMEOUT)
+            if event.type != pygame.NOEVENT:
+                waited.append(event)
+        begin_frame()
+        events = waited + pygame.event.get()
         keys_pressed = pygame.key.get_pressed()
         for event in events:
             if event.type == pygame.QUIT:  # Then prepare to quit program
@@ -355,12 +374,17 @@ def graph_config_window() -> None:
         if not running:
             break
     
-        # Update function enablers and render button
-        for enabler in enablers:
-            if enabler.update():
-                enabler.draw()
+        # Update render button and function enablers
         if render_button.update():
             render_button.draw()
+        for row, enabler in enumerate(enablers):
+            if enabler.update():
+                enabler.draw()
+                # Its layer is kept, so showing it again is free, and its render waits while it is hidden
+                grapher.show_layer(func_scroll + row, enabler.on)
+                renderer.show(func_scroll + row, enabler.on)
+                if enabler.on and not grapher.is_current(func_scroll + row, funcs[row].text):
+                    render_button.is_click = True
     
         # Update function insert buttons
         shift_pressed: bool = keys_pressed[pygame.K_LSHIFT]
@@ -418,37 +442,72 @@ def graph_config_window() -> None:
         for func in funcs + bounds + (res_box_x, res_box_y):
             is_typing |= func.active
         
+        if validator.poll() and awaiting_check:  # Draw the functions that were waiting for their checks
+            render_button.is_click = True
+            awaiting_check = False
+        
+        # Scroll the function boxes with the mouse wheel over them, or page up and down
+        for event in events:
+            if event.type == pygame.MOUSEWHEEL and function_area.collidepoint(pygame.mouse.get_pos()):
+                scroll_functions(func_scroll - event.y)
+        if (keys_pressed[pygame.K_PAGEUP] or keys_pressed[pygame.K_PAGEDOWN]) and not page_cool:
+            page_cool = True
+            scroll_functions(func_scroll + (FUNCTION_ROWS if keys_pressed[pygame.K_PAGEDOWN] else -FUNCTION_ROWS))
+        elif not keys_pressed[pygame.K_PAGEUP] and not keys_pressed[pygame.K_PAGEDOWN]:
+            page_cool = False
+        
         # Update functions
-        invalid_funcs: list[bool] = [False for _ in funcs]
-        for idx, (func_box, func_error) in enumerate(zip(funcs, func_errors)):
+        invalid_funcs: list[bool] = [False for _ in func_texts]
+        for row, (func_box, func_error) in enumerate(zip(funcs, func_errors)):
+            idx: int = func_scroll + row
             func_box.update(events)
             if func_box.active or func_box.was_active:
                 if keys_pressed[pygame.K_TAB] and not tab_cool:  # Tab switching
-                    funcs[idx].active = False
-                    funcs[(idx - (1 if shift_pressed else -1)) % 4].active = True
                     tab_cool = True
+                    func_box.active = False
+                    target: int = (idx + (-1 if shift_pressed else 1)) % len(func_texts)
+                    if not func_scroll <= target < func_scroll + FUNCTION_ROWS:  # Bring it into view
+                        scroll_functions(target if target < func_scroll else target - FUNCTION_ROWS + 1)
+                        funcs[target - func_scroll].active = True
+                        break
+                    funcs[target - func_scroll].active = True
                 func_box.draw()
-                func_error.hide(BG_COLOR, 300)
+                error_text: str | None = None
                 if func_box.text:
-                    valid_prompt = grapher.validate_equation(func_box.text)
-                    if valid_prompt[1]:  # If there is an error code
+                    valid_prompt = validator.check(idx, func_box.text, grapher.m, grapher.n)
+                    if valid_prompt is None:  # Still being checked, keep showing the last error
+                        error_text = func_error.text if func_error.drawn and func_error.drawn[0] else None
+                    elif valid_prompt[1]:  # If there is an error code
                         invalid_funcs[idx] = True
                         
-                        func_error.text = "Invalid Function/Relation"
+                        error_text = "Invalid Function/Relation"
                         if valid_prompt[1] == 1:
-                            func_error.text = "Missing: = and/or (x or y)"
+                            error_text = "Missing: = and/or (x or y)"
                         elif valid_prompt[1] == 2:
-                            func_error.text = "Arithmetic Error"
+                            error_text = "Arithmetic Error"
+                        elif valid_prompt[1] == TIMED_OUT:
+                            error_text = "Too Slow to Evaluate"
                         elif valid_prompt[1] == 10:
-                            func_error.text = f"Assigned value to: $m"
-                            if grapher.old_m != grapher.m:
+                            error_text = f"Assigned value to: $m"
+                            if grapher.assign('m', valid_prompt[2]):
                                 render_button.is_click = True
                         elif valid_prompt[1] == 11:
-                            func_error.text = f"Assigned value to: $n"
-                            if grapher.old_n != grapher.n:
+                            error_text = f"Assigned value to: $n"
+                            if grapher.assign('n', valid_prompt[2]):
                                 render_button.is_click = True
-                    
-                        func_error.draw(from_right=True)
+                
+                # Only redrawn when the error changes
+                if error_text != func_error.text:
+                    func_error.hide(BG_COLOR, True)
+                if error_text:
+                    func_error.text = error_text
+                    func_error.draw(from_right=True)
+        store_functions()
+        if func_texts[-1]:  # There is always an empty function to type the next one into
+            func_texts.append("")
+            func_on.append(True)
+            grapher.add_function()
+            renderer.add_function()
         
         # Update bounds
         invalid_bounds, bound_box_changed = False, False
@@ -475,33 +534,33 @@ def graph_config_window() -> None:
                 elif idx == 3:  # Top
                     bounds[1 if not shift_pressed else 0].active = True  # Right, S: Left
                 tab_cool = True
-            bound_error.hide(GP_BORDER_COLOR)
             bound_box.draw()
             
+            bound_invalid: bool = False  # If this box's error is shown
             try:
                 if 0 < abs(eval(bound_box.text)) < 1E-5:
-                    bound_error.draw()
-                    invalid_bounds = True
+                    bound_invalid = True
                 # Compare if right_bound > left_bound and upper_bound > lower_bound
                 pair_idx = idx + 1 if idx % 2 == 0 else idx - 1  # Pair up and down with left and right
                 if pair_idx > idx:
                     if eval(bound_box.text, {}, func_dict) >= eval(bounds[pair_idx].text, {}, func_dict):
-                        bound_error.draw()
-                        invalid_bounds = True
+                        bound_invalid = True
                 elif eval(bound_box.text, {}, func_dict) <= eval(bounds[pair_idx].text, {}, func_dict):
-                    bound_error.draw()
-                    invalid_bounds = True
+                    bound_invalid = True
             except (ArithmeticError, TypeError, SyntaxError, SyntaxWarning, NameError, ValueError):
                 # If the boundary is invalid
-                if invalid_bounds:
-                    bound_error.hide(GP_BORDER_COLOR)
-            
+                bound_invalid = False
                 try:
                     eval(bound_box.text, {}, func_dict)
                 except (ArithmeticError, TypeError, SyntaxError, SyntaxWarning, NameError, ValueError):
                     # If error is within its own box instead of being higher or lower than its pair
-                    bound_error.draw()
+                    bound_invalid = True
                 invalid_bounds = True
+            invalid_bounds |= bound_invalid
+            if bound_invalid:  # Drawn or hidden once, so an unchanged error isn't redrawn every frame
+                bound_error.draw()
+            else:
+                bound_error.hide(GP_BORDER_COLOR)
         
         pan_or_zoom: bool = False  # Tells graph if to transform graph instead of render again
         # Buttons
@@ -638,15 +697,30 @@ def graph_config_window() -> None:
             
             if keys_pressed[pygame.K_F10] and not cap_cool:
                 cap_cool = True
-                for proc in proc_queue:
-                    if proc is not None:
-                        print("Can\'t capture while function is being rendered")
-                        break
+                if renderer.busy():
+                    print("Can\'t capture while function is being rendered")
                 else:
                     graph_capture(window)
             elif not keys_pressed[pygame.K_F10]:
                 cap_cool = False
             
+            if keys_pressed[pygame.K_F3] and not hud_cool:  # Performance overlay
+                hud_cool = True
+                overlay.toggle()
+            elif not keys_pressed[pygame.K_F3]:
+                hud_cool = False
+            
+            if keys_pressed[pygame.K_F9] and not trace_cool:  # Chrome trace of the last frames, S: profile the next
+                trace_cool = True
+                trace_name: str = "_on_" + asctime(localtime(time()))[4:].replace(' ', '_').replace(':', '.')
+                if shift_pressed:
+                    start_profile(path.join("GraphCaptures", "profile" + trace_name + ".prof"))
+                else:
+                    dump_chrome_trace(path.join("GraphCaptures", "trace" + trace_name + ".json"))
+                    print(f"Saved trace to GraphCaptures/trace{trace_name}.json")
+            elif not keys_pressed[pygame.K_F9]:
+                trace_cool = False
+            
         did_poz |= pan_or_zoom
         render_button.text = "refresh" if did_poz else "enter"
         render_button.draw()
@@ -700,29 +774,28 @@ def graph_config_window() -> None:
             pygame.display.set_mode(WIN_RES, pygame.DOUBLEBUF)
             grapher.reset(GRAPH_RES, GRAPH_POS, (float(eval(left_bound.text)), float(eval(right_bound.text))),
                           (float(eval(lower_bound.text)), float(eval(upper_bound.text))))
-            # Allow for new window to have the same settings as previously
-            dce_texts = (left_bound.text, right_bound.text, lower_bound.text, upper_bound.text,
-                         enablers[0].on, enablers[1].on, enablers[2].on, enablers[3].on,
-                         funcs[0].text, funcs[1].text, funcs[2].text, funcs[3].text)
+            # Allow for new window to have the same settings as previously, the functions are kept as they are
+            dce_texts = (left_bound.text, right_bound.text, lower_bound.text, upper_bound.text)
             draw_config_elements()
+            overlay.pos, overlay.last_draw = (WIN_RES[0] - 3, 2), 0
             render_button.is_click = True
             res_changed = False
         
         # Check if function process is finished
-        for i in range(len(funcs)):
-            if proc_queue[i] is not None:
-                if not proc_queue[i].is_alive():  # If plotting is finished
-                    try:
-                        grapher.graph_points[i] = mang_dict[i]
-                        indicators[i].hide(BG_COLOR)
-                        proc_queue[i] = None
-                        del mang_dict[i]
+        with span("collect"):
+            for i in range(len(func_texts)):
+                if renderer.poll(i):  # If a pass of plotting is finished
+                    if not renderer.busy(i):
+                        show_indicator(i, False)
 
-                        # Cause function to be drawn
-                        render_button.is_click = True
-                        pan_or_zoom = True
-                    except KeyError:
-                        grapher.graph_points[i] = None
+                    # Redraw only this function's layer, fast enough for the main thread
+                    grapher.clear_layer(i)
+                    if renderer.strokes[i] is not None:  # x or y function
+                        grapher.draw_strokes(i, *renderer.strokes[i], line_color(i, LINE_COLORS), LINE_WIDTH)
+                    else:  # With the finer pass of the relation
+                        grapher.graph_points[i] = renderer.visible(i)
+                        grapher.draw_graph(i, line_color(i, LINE_COLORS), LINE_WIDTH, animate=False)
+            renderer.collect_stale()
 
         if not keys_pressed[pygame.K_TAB]:
             tab_cool = False
@@ -730,73 +803,65 @@ def graph_config_window() -> None:
         # Rendering graph
         if not invalid_bounds:
             if render_button.is_click:
-                new_bounds: tuple = left_bound.text, right_bound.text, lower_bound.text, upper_bound.text
-                new_funcs: tuple = tuple(func.text for func in funcs)
-                
                 if not pan_or_zoom:  # If new graph is requested
-                    for process in proc_queue:  # Stop current graphing processes
-                        if process is not None:
-                            process.terminate()
-                render_queue.clear()
-                for idx, (indicator, enabler, func, color) in enumerate(zip(indicators, enablers, funcs, LINE_COLORS)):
-                    if enabler.on:
-                        if pan_or_zoom:  # Simple transform
-                            valid_prompt: tuple[tuple, int] = grapher.validate_equation(func.text)
-                            if valid_prompt[0]:
-                                if valid_prompt[0][0] == "(y)" and 'y' not in valid_prompt[0][1] \
-                                        or valid_prompt[0][0] == "(x)" and 'x' not in valid_prompt[0][1]:
-                                    # x and y functions are fast enough to re-plot for each transform
-                                    render_queue.append(Thread(target=grapher.function_graph,
-                                                               args=(valid_prompt[0], indicator, color, LINE_WIDTH)))
-                                else:  # Shifted iterative graphs will have missing points
-                                    render_queue.append(Thread(target=grapher.draw_graph,
-                                                               args=(idx, color, LINE_WIDTH)))
-                        elif not grapher.graph_points[idx] or old_bounds != new_bounds or old_funcs != new_funcs:
-                            # If the function different from before, render
-                            # Runs if the render butter was pressed
-                            did_poz = False
-                            valid_prompt: tuple[tuple, int] = grapher.validate_equation(func.text)
-                            if valid_prompt[0] and not invalid_funcs[idx] and\
-                                    (valid_prompt[0][0] == "(y)" and 'y' not in valid_prompt[0][1]\
-                                     or valid_prompt[0][0] == "(x)" and 'x' not in valid_prompt[0][1]):
-                                render_queue.append(Thread(target=grapher.function_graph,
-                                                               args=(valid_prompt[0], indicator,
-                                                                     color, LINE_WIDTH)))
-                              
-                            else:
-                                if proc_queue[idx]:
-                                    if proc_queue[idx].is_alive():  # Then stop current graphing process
-                                        proc_queue[idx].terminate()
-                                proc_queue[idx] = Process(target=iterative_points,
-                                                            args=(valid_prompt[0], grapher.x_bounds,
-                                                                grapher.y_bounds, grapher.range,
-                                                                grapher.resolution, mang_dict, idx))
-                                indicator.hide(BG_COLOR)
-                                indicator.draw()
-                                proc_queue[idx].start()
-                                # render_queue.append(Thread(target=grapher.iterative_graph,
-                                #                            args=(valid_prompt[0], indicator,
-                                #                                  color, LINE_WIDTH, idx)))
-                            old_funcs[idx] = func.text
-                        else:
-                            print(f"func{idx} is an invalid function/relation")
-                        
+                    did_poz = False
+                # Apply the new bounds first, so renders and cached tiles are looked up for the new view
                 grapher.reset(GRAPH_RES, GRAPH_POS, (float(eval(left_bound.text)), float(eval(right_bound.text))),
                               (float(eval(lower_bound.text)), float(eval(upper_bound.text))))
-                grapher.clear_graph()
-                for thread in render_queue:
-                    thread.start()
-                old_bounds = deepcopy(new_bounds)
+                for idx, (on, func_text) in enumerate(zip(func_on, func_texts)):
+                    # $m and $n are assigned first, so every function is drawn with them
+                    if not on:
+                        continue
+                    valid_prompt: tuple | None = validator.check(idx, func_text, grapher.m, grapher.n, wait=False)
+                    if valid_prompt is None:
+                        awaiting_check = True
+                    elif valid_prompt[1] in (10, 11):
+                        grapher.assign("mn"[valid_prompt[1] - 10], valid_prompt[2])
+                for idx, (on, func_text) in enumerate(zip(func_on, func_texts)):
+                    # Only functions whose equation, bounds, $m or $n changed are drawn again, onto their own layer
+                    if not on or grapher.is_current(idx, func_text):
+                        continue
+                    valid_prompt: tuple | None = validator.check(idx, func_text, grapher.m, grapher.n, wait=False)
+                    if valid_prompt is None:  # Drawn once its check arrives
+                        grapher.clear_layer(idx)
+                        renderer.discard(idx)
+                        awaiting_check = True
+                        continue
+                    grapher.begin_layer(idx, func_text)
+                    if not valid_prompt[0] or invalid_funcs[idx]:
+                        renderer.discard(idx)  # Cancel its render, tiles already finished are still cached
+                        show_indicator(idx, False)
+                        if func_text and valid_prompt[1] not in (10, 11):
+                            print(f"func{idx} is an invalid function/relation")
+                        continue
+                    
+                    if valid_prompt[0][0] == "(y)" and 'y' not in valid_prompt[0][1] \
+                            or valid_prompt[0][0] == "(x)" and 'x' not in valid_prompt[0][1]:
+                        # x and y functions are fast enough to re-plot for each transform
+                        renderer.request_explicit(idx, valid_prompt[0], grapher.x_bounds, grapher.y_bounds,
+                                                  grapher.resolution)
+                    else:  # Draw the cached tiles, the tiles that aren't cached are rendered by the worker pool
+                        grapher.graph_points[idx] = renderer.request(idx, valid_prompt[0], grapher.m, grapher.n,
+                                                                     grapher.x_bounds, grapher.y_bounds,
+                                                                     grapher.resolution)
+                        # New graphs are revealed, transforms are drawn at once
+                        grapher.draw_graph(idx, line_color(idx, LINE_COLORS), LINE_WIDTH, animate=not pan_or_zoom)
+                    show_indicator(idx, renderer.busy(idx))
+        renderer.dispatch()  # Every request of the frame is queued first, so they are started fairly
         
-        pygame.display.update()
+        if grapher.changed:  # Layers were drawn on, hidden or shown
+            grapher.composite()
+        overlay.draw(TICK, len(func_texts))
+        with span("update"):
+            changed: bool = flush()  # Only the areas drawn over are updated
+        end_frame()
+        idle = not events and not changed and not renderer.busy() and not renderer.stale and not grapher.changed \
+            and not validator.busy()
         clock.tick(TICK)
     
     # Wait for all graphing processes to finish, then quit PyGame
-    for thread in render_queue:
-        thread.join()
-    for process in proc_queue:
-        if process is not None:
-            process.terminate()
+    renderer.close()
+    validator.close()
     pygame.quit()
     return None
 
@@ -0,0 +1,70 @@
+from os import path
+from functools import lru_cache
+
+import pygame
+
+FONT_PATH: str = path.join("Assets", "FiraCode.ttf")
+LABEL_CACHE: int = 1024  # Rendered labels kept, enough for every tick label of several views and the widgets
+GOLDEN_ANGLE: float = 137.508  # Degrees between the hues of generated colors, so neighbours always contrast
+
+dirty: list[pygame.Rect] = []  # Areas of the window drawn over since the last flush
+whole_window: bool = False  # Set when the whole window was redrawn, e.g. after changing resolution
+
+
+def mark_dirty(rect: pygame.Rect) -> None:
+    """
+    Records an area of the window that was drawn over
+    """
+    if rect not in dirty:
+        dirty.append(pygame.Rect(rect))
+    return None
+
+
+def mark_all() -> None:
+    global whole_window
+    whole_window = True
+    return None
+
+
+def flush() -> bool:
+    """
+    Copies only the areas drawn over to the screen
+    Returns True if anything had changed
+    """
+    global dirty, whole_window
+    rects, dirty = dirty, []
+    if whole_window:
+        whole_window = False
+        pygame.display.update()
+        return True
+    if rects:
+        pygame.display.update(rects)
+    return bool(rects)
+
+
+@lru_cache(maxsize=None)
+def font(size: int) -> pygame.font.Font:
+    """
+    The app's font at a size, loaded from disk once
+    """
+    return pygame.font.Font(FONT_PATH, size)
+
+
+@lru_cache(maxsize=LABEL_CACHE)
+def label(text: str, color: tuple, size: int, background: tuple | None = None) -> pygame.Surface:
+    """
+    Renders text, reusing the surface if the same text was rendered recently
+    The surface is shared, so it must only be blitted, never drawn on
+    """
+    return font(size).render(text, True, color, background)
+
+
+def line_color(idx: int, colors: tuple) -> tuple:
+    """
+    The color of a function's graph, one of colors, then hues generated around the color wheel
+    """
+    if idx < len(colors):
+        return colors[idx]
+    color: pygame.Color = pygame.Color(0, 0, 0)
+    color.hsva = GOLDEN_ANGLE * idx % 360, 85, 80, 100
+    return color.r, color.g, color.b
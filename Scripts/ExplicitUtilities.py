@@ -0,0 +1,118 @@
+from math import nan
+from types import CodeType
+
+import numpy
+
+from Scripts.VectorUtilities import evaluate_vector
+
+ADAPTIVE_START: int = 8  # Pixels between the first, coarse samples
+ADAPTIVE_TOLERANCE: float = 0.5  # Pixels the drawn line may stray from the function
+ADAPTIVE_MIN_WIDTH: float = 1 / 16  # Fraction of a pixel below which intervals are never split
+ADAPTIVE_MAX_DEPTH: int = 16  # Most times an interval can be split
+
+
+def adaptive_samples(expression: str | CodeType, variable: str, bounds: tuple[float, float], pixels: int,
+                     value_bounds: tuple[float, float], value_pixels: int) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Samples f(variable) coarsely, then keeps halving the intervals where the line between samples strays
+    from the function by more than ADAPTIVE_TOLERANCE pixels, or the function becomes undefined
+    An interval that still strays at ADAPTIVE_MIN_WIDTH of a pixel is only broken, by making its middle sample NaN,
+    if its ends differ by more than the graph's height, an asymptote or jump crossing the graph
+    Functions that merely oscillate faster than the pixels are kept whole, drawn as a band
+    Returns the sorted samples and the function's values, NaN where it is undefined
+    """
+    pixel: float = (bounds[1] - bounds[0]) / pixels
+    value_pixel: float = (value_bounds[1] - value_bounds[0]) / value_pixels
+    value_range: float = value_bounds[1] - value_bounds[0]
+
+    def clipped(values: numpy.ndarray) -> numpy.ndarray:
+        # Samples far outside the graph are never drawn, so how they curve doesn't matter
+        return numpy.clip(values, value_bounds[0] - value_range, value_bounds[1] + value_range)
+
+    samples = numpy.linspace(bounds[0], bounds[1], num=max(pixels // ADAPTIVE_START, 2) + 1)
+    if bounds[0] < 0 < bounds[1]:  # Add zero to the graph if it is within boundaries
+        samples = numpy.sort(numpy.append(samples, 0))
+    values = evaluate_vector(expression, **{variable: samples})
+
+    splitting = numpy.ones(len(samples) - 1, dtype=bool)  # Whether each interval between samples may be split
+    for _ in range(ADAPTIVE_MAX_DEPTH):
+        if not splitting.any():
+            break
+        starts = numpy.nonzero(splitting)[0]
+        middles = (samples[starts] + samples[starts + 1]) * 0.5
+        middle_values = evaluate_vector(expression, **{variable: middles})
+
+        ends = values[starts], values[starts + 1]
+        with numpy.errstate(invalid="ignore"):
+            straying = numpy.fabs(clipped(middle_values) - (clipped(ends[0]) + clipped(ends[1])) * 0.5) \
+                > ADAPTIVE_TOLERANCE * value_pixel
+        # Where the function starts or stops being defined
+        domain_edge = (numpy.isnan(ends[0]) != numpy.isnan(ends[1])) | \
+            (numpy.isnan(ends[0]) == numpy.isnan(ends[1])) & (numpy.isnan(ends[0]) != numpy.isnan(middle_values))
+        wide = samples[starts + 1] - samples[starts] > 2 * ADAPTIVE_MIN_WIDTH * pixel
+        split = (straying | domain_edge) & wide
+        with numpy.errstate(invalid="ignore"):
+            unbounded = numpy.fabs(clipped(ends[1]) - clipped(ends[0])) > value_range
+        middle_values[straying & unbounded & ~wide] = nan  # Break the line at jumps and asymptotes
+
+        # Keep every new sample, only the halves of split intervals are looked at again
+        order = numpy.argsort(numpy.concatenate((samples, middles)), kind="stable")
+        samples = numpy.concatenate((samples, middles))[order]
+        values = numpy.concatenate((values, middle_values))[order]
+        start_splitting = numpy.concatenate((numpy.zeros(len(splitting) + 1, dtype=bool), split))
+        start_splitting[starts] = split
+        splitting = start_splitting[order][:-1]
+
+    return samples, values
+
+
+def clip_strokes(samples: numpy.ndarray, values: numpy.ndarray,
+                 value_bounds: tuple[float, float]) -> tuple[numpy.ndarray, list[int]]:
+    """
+    Splits a sampled function into strokes at undefined samples, clipping every segment to value_bounds at once
+    Segments crossing a boundary are cut where they cross it, so strokes run right up to the edge of the graph
+    Returns the vertices of every stroke as (sample, value) rows, and the row each stroke starts at
+    """
+    sample_steps, value_steps = numpy.diff(samples), numpy.diff(values)
+    low, high = value_bounds
+    with numpy.errstate(all="ignore"):  # Flat and undefined segments are dealt with below
+        crossings = ((low - values[:-1]) / value_steps, (high - values[:-1]) / value_steps)
+        flat = value_steps == 0  # Wholly inside or outside, never crossing a boundary
+        enter = numpy.where(flat, 0, numpy.maximum(numpy.minimum(*crossings), 0))
+        leave = numpy.where(flat, 1, numpy.minimum(numpy.maximum(*crossings), 1))
+        visible = numpy.isfinite(value_steps) & numpy.where(flat, (low <= values[:-1]) & (values[:-1] <= high),
+                                                            enter < leave)
+    segments = numpy.flatnonzero(visible)
+    if not len(segments):
+        return numpy.empty((0, 2)), []
+
+    # A segment continues the stroke before it if both meet inside the graph
+    joined = numpy.zeros(len(visible), dtype=bool)
+    joined[1:] = visible[:-1] & (leave[:-1] == 1) & (enter[1:] == 0)
+    new_stroke: numpy.ndarray = ~joined[segments]
+    # Every segment adds its end, and its start too if it begins a stroke
+    end_rows: numpy.ndarray = numpy.cumsum(1 + new_stroke) - 1
+    start_rows: numpy.ndarray = end_rows[new_stroke] - 1
+
+    vertices: numpy.ndarray = numpy.empty((end_rows[-1] + 1, 2))
+    vertices[end_rows, 0] = samples[segments] + leave[segments] * sample_steps[segments]
+    vertices[end_rows, 1] = values[segments] + leave[segments] * value_steps[segments]
+    starts: numpy.ndarray = segments[new_stroke]
+    vertices[start_rows, 0] = samples[starts] + enter[starts] * sample_steps[starts]
+    vertices[start_rows, 1] = values[starts] + enter[starts] * value_steps[starts]
+    return vertices, start_rows.tolist()
+
+
+def explicit_strokes(equation: tuple[str, str], x_bounds: tuple[float, float], y_bounds: tuple[float, float],
+                     resolution: tuple[int, int]) -> tuple[numpy.ndarray, list[int]]:
+    """
+    Samples a y function y = f(x) or an x function x = f(y) and clips it to the graph
+    Returns the vertices of every stroke as (x, y) rows, and the row each stroke starts at
+    """
+    lhs, rhs = equation
+    if lhs == "(y)":
+        samples, values = adaptive_samples(rhs, 'x', x_bounds, resolution[0], y_bounds, resolution[1])
+        return clip_strokes(samples, values, y_bounds)
+    samples, values = adaptive_samples(rhs, 'y', y_bounds, resolution[1], x_bounds, resolution[0])
+    vertices, starts = clip_strokes(samples, values, x_bounds)
+    return vertices[:, ::-1], starts  # x functions are sampled along y
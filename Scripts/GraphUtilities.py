@@ -1,8 +1,14 @@
 from multiprocessing import Pool
+from functools import lru_cache
+from types import CodeType
 from math import *
+from numbers import Real
 from numpy import linspace
 
+from Scripts.ParseUtilities import parse_equation
+
 INVALID: tuple = None, None
+COMPILE_CACHE_SIZE: int = 256  # Number of equations and expressions kept compiled
 
 
 def gamma_shift(x) -> float:
@@ -20,29 +26,33 @@ for func in funcs:
     eval_dict[func] = locals().get(func)
 
 
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
 def format_equation(equation: str, m: float, n: float) -> tuple[str, str]:
     """
-    Turns an equation from a string and formats its constants and functions to be Python-readable
-    """
-    # Replace constants
-    temp: str = equation.replace('x', "(x)").replace('y', "(y)")
-    temp = temp.replace("log", "log10").replace("ln", "log") \
-               .replace("fact", "factorial").replace("factorial", "gamma_shift") \
-               .replace("csc", "1/sin").replace("cosec", "1/sin") \
-               .replace("sec", "1/cos").replace("cot", "1/tan") \
-               .replace("arcsin", "asin").replace("arccos", "acos").replace("arctan", "atan") \
-               .replace("abs", "fabs").replace('^', "**").replace(")(", ")*(") \
-               .replace("$m", f"({m})").replace("$n", f"({n})").replace('e', f"({e})").replace("pi", f"({pi})")
-    
-    # Multiply coefficients in terms, including functions
-    # e.g. 2x = 2 * x, 10sinx = 10*sin(x)
-    for function in funcs + ('(', "sec", "csc", "cosec", "cot" + "ln"):
-        for i in range(10):  # All digits 0..9
-            temp = temp.replace(f"{i}{function}", f"{i}*{function}")
-    
-    # Replace the names of some functions with the names the graph uses
-    # e.g. log -> log of base 10, ln -> log of base e
-    return tuple(temp.split('='))
+    Parses an equation from a string into the Python source of both of its sides
+    Constants, $m and $n are folded and repeated parts are computed once, see ParseUtilities
+    Raises SyntaxError, NameError or TypeError if the equation is invalid
+    """
+    return parse_equation(equation, m, n)
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_expression(expression: str) -> CodeType:
+    """
+    Compiles a formatted expression into a code object, x and y are left as real variables
+    Raises SyntaxError if the expression is not Python-readable
+    """
+    return compile(expression.strip(), "<equation>", "eval")
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_equation(equation: str, m: float, n: float) -> tuple[CodeType, CodeType]:
+    """
+    Formats and compiles both sides of an equation once
+    Cached by the equation text and the values of $m and $n, so unchanged functions are never parsed again
+    """
+    lhs, rhs = format_equation(equation, m, n)
+    return compile_expression(lhs), compile_expression(rhs)
 
 
 def test_for_intercept(info_pack: tuple[str, str, tuple[float, float], float, float]) -> tuple[float, float]:
@@ -52,14 +62,15 @@ def test_for_intercept(info_pack: tuple[str, str, tuple[float, float], float, fl
     lhs, rhs, coordinate, x_tol, y_tol = info_pack
     x_, y_ = coordinate
 
-    std_form: str = f"{lhs} - ({rhs})"  # Turn into an equation equal to zero
+    std_form: CodeType = compile_expression(f"{lhs.strip()} - ({rhs.strip()})")  # Turn into an equation equal to zero
+    namespace: dict = dict(eval_dict)
 
     try:
-        tl: float = eval(std_form.strip().replace('x', str(x_ - x_tol)).replace('y', str(y_ + y_tol)), {}, eval_dict)
-        tr: float = eval(std_form.strip().replace('x', str(x_ + x_tol)).replace('y', str(y_ + y_tol)), {}, eval_dict)
-        bl: float = eval(std_form.strip().replace('x', str(x_ - x_tol)).replace('y', str(y_ - y_tol)), {}, eval_dict)
-        br: float = eval(std_form.strip().replace('x', str(x_ + x_tol)).replace('y', str(y_ - y_tol)), {}, eval_dict)
-        pixel_corners: tuple = tl, tr, bl, br
+        pixel_corners: list[float] = []
+        for corner in ((x_ - x_tol, y_ + y_tol), (x_ + x_tol, y_ + y_tol),
+                       (x_ - x_tol, y_ - y_tol), (x_ + x_tol, y_ - y_tol)):  # tl, tr, bl, br
+            namespace['x'], namespace['y'] = float(corner[0]), float(corner[1])
+            pixel_corners.append(eval(std_form, namespace))
 
         low, high = min(pixel_corners), max(pixel_corners)
         if high >= 0 and low <= 0:  # There is an intersection
@@ -71,9 +82,12 @@ def test_for_intercept(info_pack: tuple[str, str, tuple[float, float], float, fl
     return INVALID
 
 
-def generate_plot_points(info_packs: tuple[tuple]) -> list[tuple[float, float]]:
-    with Pool(processes=4) as pool:
-        plot_points: list[tuple[float, float]] = list(pool.map(test_for_intercept, info_packs))
+def generate_plot_points(info_packs: tuple[tuple], pool: Pool, workers: int) -> list[tuple[float, float]]:
+    """
+    Tests every pixel on the long-lived worker pool of workers processes, see WorkerUtilities.start_pool
+    """
+    chunk_size: int = max(len(info_packs) // (4 * workers), 1)  # A few large tasks per worker
+    plot_points: list[tuple[float, float]] = list(pool.map(test_for_intercept, info_packs, chunksize=chunk_size))
     
     # Remove points not on graph (remove all INVALIDs from this list)
     for _ in range(plot_points.count(INVALID)):
@@ -103,3 +117,68 @@ def generate_iterative_plots(equation: tuple[str, str], x_bounds, y_bounds, rang
             info_packs.append((lhs, rhs, (x, 0), x_tol, y_tol))
     
     return tuple(info_packs)
+
+
+def real_value(value) -> float | None:
+    """
+    The value assigned to $m or $n as a float, None if it isn't a finite real number, e.g. a list or 1j
+    """
+    if not isinstance(value, Real) or isinstance(value, bool):
+        return None
+    try:
+        value = float(value)
+    except OverflowError:  # An integer too large for a float
+        return None
+    return value if isfinite(value) else None
+
+
+def check_equation(equ_raw: str, m: float, n: float) -> tuple[tuple[str, str] | None, int, float | None]:
+    """
+    Checks an equation as typed, without changing any state, so it can run on a worker, see Grapher.validate_equation
+    Returns the left and right hand sides of a valid equation, the error code, which is 0 if valid,
+    and the value assigned to $m (code 10) or $n (code 11), None if it couldn't be evaluated
+    Assigning anything but a real number is invalid (code 5)
+    """
+    # Check if the function is only assigning to variable m
+    if equ_raw.startswith("m=") or equ_raw.startswith("m =") and 'x' not in equ_raw and 'y' not in equ_raw:
+        try:
+            value = eval(equ_raw.split('=')[1].strip())
+        except (ArithmeticError, TypeError, SyntaxError, SyntaxWarning, NameError, ValueError, OverflowError):
+            return None, 10, None
+        return (None, 5, None) if real_value(value) is None else (None, 10, real_value(value))
+    # Check if the function is only assigning to variable n
+    if equ_raw.startswith("n=") or equ_raw.startswith("n =") and 'x' not in equ_raw and 'y' not in equ_raw:
+        if equ_raw.count('=') == 1 and len(equ_raw.split('=')) > 1:
+            try:
+                value = eval(equ_raw.split('=')[1].strip())
+            except (ArithmeticError, TypeError, SyntaxError, SyntaxWarning, NameError, ValueError, OverflowError):
+                return None, 11, None
+            return (None, 5, None) if real_value(value) is None else (None, 11, real_value(value))
+
+    # Invalidate equations with guaranteed empty graphs
+    if equ_raw.count('=') != 1 or ('x' not in equ_raw and 'y' not in equ_raw):  # If not a relation of x or y
+        return None, 1, None
+    if "/0" in equ_raw.replace(' ', ""):  # If division by zero is a literal
+        return None, 2, None
+
+    try:
+        # Parse into python-readable source, unknown names and malformed input are rejected here
+        formatted_equation = format_equation(equ_raw, m, n)
+        # Evaluate both sides to find inherent mistakes in input
+        lhs_code, rhs_code = compile_equation(equ_raw, m, n)
+        eval(lhs_code, dict(eval_dict, x=1, y=1)),  # 1 is a testing value
+        eval(rhs_code, dict(eval_dict, x=1, y=1))
+    except ZeroDivisionError:  # e.g. 1/x when x = 0
+        pass
+    except ValueError:  # e.g. out of domain of arcsin (-1, 1)
+        pass
+    except ArithmeticError:
+        return None, 2, None
+    except NameError:
+        return None, 3, None
+    except (SyntaxError, SyntaxWarning):
+        return None, 4, None
+    except TypeError:
+        return None, 5, None
+
+    return (formatted_equation[0].strip(), formatted_equation[1].strip()), 0, None
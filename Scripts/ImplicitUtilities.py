@@ -0,0 +1,276 @@
+import numpy
+
+from Classes.Interval import Interval
+from Scripts.VectorUtilities import evaluate_vector
+from Scripts.IntervalUtilities import evaluate_interval
+
+QUADTREE_START: int = 16  # Width in pixels of the coarsest cells adaptive_grid starts from, a power of two
+QUADTREE_DENSE: float = 0.25  # Fraction of the graph that may hold the curve past which the quadtree gives up
+
+
+def standard_form(equation: tuple[str, str]) -> str:
+    """
+    Turns a formatted relation into an expression equal to zero, i.e. lhs - (rhs)
+    """
+    lhs, rhs = equation
+    return f"{lhs.strip()} - ({rhs.strip()})"
+
+
+def implicit_grid(equation: tuple[str, str], x_bounds, y_bounds, resolution) -> numpy.ndarray:
+    """
+    Evaluates the relation once on every corner of every pixel, a (H + 1) x (W + 1) lattice
+    Neighbouring pixels share their corners, so no point is evaluated twice
+    Row j, column i holds the value at (x_bounds[0] + i * pixel width, y_bounds[0] + j * pixel height)
+    """
+    x_vertices = numpy.linspace(x_bounds[0], x_bounds[1], num=resolution[0] + 1)
+    y_vertices = numpy.linspace(y_bounds[0], y_bounds[1], num=resolution[1] + 1)
+    return evaluate_vector(standard_form(equation), x=x_vertices[numpy.newaxis, :], y=y_vertices[:, numpy.newaxis])
+
+
+def sign_change_cells(values: numpy.ndarray) -> numpy.ndarray:
+    """
+    Returns a (H x W) mask of the cells whose corners are not all of the same sign, i.e. the curve passes through
+    Cells with an undefined corner are left empty
+    """
+    corners = numpy.stack((values[:-1, :-1], values[:-1, 1:], values[1:, :-1], values[1:, 1:]))
+    with numpy.errstate(invalid="ignore"):
+        return (corners.min(axis=0) <= 0) & (corners.max(axis=0) >= 0)
+
+
+# Marching squares lookup, the pairs of cell edges joined for each case of positive corners
+# Corners are weighted bottom-left 1, bottom-right 2, top-right 4, top-left 8
+# Edges are 0: bottom, 1: right, 2: top, 3: left
+# Saddles (5 and 10) are resolved separately by the value at the centre of the cell
+CONTOUR_CASES: dict = {
+    1: ((3, 0),), 2: ((0, 1),), 3: ((3, 1),), 4: ((1, 2),), 6: ((0, 2),), 7: ((3, 2),), 8: ((2, 3),),
+    9: ((0, 2),), 11: ((1, 2),), 12: ((3, 1),), 13: ((0, 1),), 14: ((3, 0),)
+}
+SADDLE_CASES: dict = {  # Case: (edges if centre is positive, edges if centre is negative)
+    5: (((0, 1), (2, 3)), ((3, 0), (1, 2))),
+    10: (((3, 0), (1, 2)), ((0, 1), (2, 3)))
+}
+
+
+def contour_segments(values: numpy.ndarray, cells: numpy.ndarray | None = None) -> numpy.ndarray:
+    """
+    Runs marching squares over a lattice from implicit_grid or adaptive_grid
+    If a (H x W) mask of cells is given, every other cell is treated as empty
+    Returns an (N x 2) array of segments, each joining the ids of two crossed lattice edges
+    Horizontal edge (j, i) has id j * W + i, vertical edge (j, i) has id (H + 1) * W + j * (W + 1) + i
+    """
+    rows, columns = values.shape[0] - 1, values.shape[1] - 1
+    # Only cells the curve may pass through are looked at
+    j, i = numpy.nonzero(sign_change_cells(values) if cells is None else cells)
+    corners = values[j, i], values[j, i + 1], values[j + 1, i + 1], values[j + 1, i]
+    defined = numpy.isfinite(corners[0]) & numpy.isfinite(corners[1]) & \
+        numpy.isfinite(corners[2]) & numpy.isfinite(corners[3])
+    cases = (corners[0] > 0) * 1 + (corners[1] > 0) * 2 + (corners[2] > 0) * 4 + (corners[3] > 0) * 8
+    cases[~defined] = 0
+    
+    # Ids of the bottom, right, top and left edges of every cell
+    vertical_start: int = (rows + 1) * columns
+    edge_ids = numpy.stack((j * columns + i, vertical_start + j * (columns + 1) + i + 1,
+                            (j + 1) * columns + i, vertical_start + j * (columns + 1) + i))
+    
+    segments: list[numpy.ndarray] = []
+    for case, edge_pairs in CONTOUR_CASES.items():
+        matched = cases == case
+        for start, end in edge_pairs:
+            segments.append(numpy.stack((edge_ids[start][matched], edge_ids[end][matched]), axis=1))
+    
+    centres = (corners[0] + corners[1] + corners[2] + corners[3]) * 0.25
+    for case, (positive_pairs, negative_pairs) in SADDLE_CASES.items():
+        for centre_positive, edge_pairs in ((True, positive_pairs), (False, negative_pairs)):
+            matched = (cases == case) & ((centres > 0) == centre_positive)
+            for start, end in edge_pairs:
+                segments.append(numpy.stack((edge_ids[start][matched], edge_ids[end][matched]), axis=1))
+    
+    return numpy.concatenate(segments) if segments else numpy.empty((0, 2), dtype=int)
+
+
+def edge_vertices(values: numpy.ndarray, ids: numpy.ndarray, x_bounds, y_bounds) -> numpy.ndarray:
+    """
+    Returns the graph coordinates where the curve crosses each of the lattice edges, by linear interpolation
+    """
+    rows, columns = values.shape[0] - 1, values.shape[1] - 1
+    x_step, y_step = (x_bounds[1] - x_bounds[0]) / columns, (y_bounds[1] - y_bounds[0]) / rows
+    vertical_start: int = (rows + 1) * columns
+    
+    is_vertical = ids >= vertical_start
+    j = numpy.where(is_vertical, (ids - vertical_start) // (columns + 1), ids // columns)
+    i = numpy.where(is_vertical, (ids - vertical_start) % (columns + 1), ids % columns)
+    start = values[j, i]
+    end = numpy.where(is_vertical, values[numpy.minimum(j + 1, rows), i], values[j, numpy.minimum(i + 1, columns)])
+    t = start / (start - end)  # Fraction along the edge where the value is zero
+    
+    x = x_bounds[0] + (i + numpy.where(is_vertical, 0, t)) * x_step
+    y = y_bounds[0] + (j + numpy.where(is_vertical, t, 0)) * y_step
+    return numpy.stack((x, y), axis=1)
+
+
+def link_segments(segments: numpy.ndarray) -> list[list[int]]:
+    """
+    Joins segments sharing an edge into chains of edge ids, closed loops end with their first id
+    """
+    neighbours: dict[int, list[int]] = {}
+    for start, end in segments.tolist():
+        neighbours.setdefault(start, []).append(end)
+        neighbours.setdefault(end, []).append(start)
+    
+    chains: list[list[int]] = []
+    visited: set = set()
+    # Open chains must start from one of their ends, loops can start anywhere
+    starts: list[int] = [v for v, n in neighbours.items() if len(n) == 1] + list(neighbours)
+    for first in starts:
+        if first in visited:
+            continue
+        chain: list[int] = [first]
+        visited.add(first)
+        current: int = first
+        while True:
+            unvisited = [v for v in neighbours[current] if v not in visited]
+            if not unvisited:
+                if len(chain) > 2 and first in neighbours[current]:  # Close the loop
+                    chain.append(first)
+                break
+            current = unvisited[0]
+            visited.add(current)
+            chain.append(current)
+        chains.append(chain)
+    return chains
+
+
+def adaptive_grid(equation: tuple[str, str], x_bounds, y_bounds, resolution,
+                  seed: numpy.ndarray | None = None) -> tuple[numpy.ndarray, numpy.ndarray | None]:
+    """
+    Evaluates a relation on a quadtree, starting with QUADTREE_START pixel wide cells
+    Only cells that may hold the curve are split into quarters, down to single pixels,
+    cells where interval arithmetic proves the relation can't be zero are discarded
+    A seed is the lattice of a coarser render of the same bounds, its values are reused instead of evaluated again
+    If more than QUADTREE_DENSE of the graph may still hold the curve, e.g. many rings, splitting costs more
+    than evaluating every pixel, so the whole lattice is evaluated as in implicit_grid and tangencies aren't found
+    Returns the lattice in the same layout as implicit_grid, NaN where it was never evaluated,
+    and the (H x W) mask of pixel cells that may hold the curve, None if the whole lattice was evaluated
+    """
+    columns, rows = resolution
+    x_step, y_step = (x_bounds[1] - x_bounds[0]) / columns, (y_bounds[1] - y_bounds[0]) / rows
+    std_form: str = standard_form(equation)
+    values = numpy.full((rows + 1, columns + 1), numpy.nan)
+    known = numpy.zeros((rows + 1, columns + 1), dtype=bool)
+    if seed is not None:
+        scale: int = rows // (seed.shape[0] - 1)
+        values[::scale, ::scale] = seed
+        known[::scale, ::scale] = ~numpy.isnan(seed)  # Corners never evaluated, or undefined, are evaluated again
+    
+    size: int = QUADTREE_START
+    j0, i0 = numpy.mgrid[0:rows:size, 0:columns:size]
+    j0, i0 = j0.ravel(), i0.ravel()
+    while True:
+        j1, i1 = numpy.minimum(j0 + size, rows), numpy.minimum(i0 + size, columns)
+        
+        # Evaluate the corners that no previous level has
+        corner_j = numpy.concatenate((j0, j0, j1, j1))
+        corner_i = numpy.concatenate((i0, i1, i0, i1))
+        new = ~known[corner_j, corner_i]
+        new_corners = numpy.unique(corner_j[new] * (columns + 1) + corner_i[new])
+        new_j, new_i = new_corners // (columns + 1), new_corners % (columns + 1)
+        values[new_j, new_i] = evaluate_vector(std_form, x=x_bounds[0] + new_i * x_step, y=y_bounds[0] + new_j * y_step)
+        known[new_j, new_i] = True
+        
+        corners = values[j0, i0], values[j0, i1], values[j1, i0], values[j1, i1]
+        low = numpy.fmin(numpy.fmin(corners[0], corners[1]), numpy.fmin(corners[2], corners[3]))
+        high = numpy.fmax(numpy.fmax(corners[0], corners[1]), numpy.fmax(corners[2], corners[3]))
+        # Bound the relation over the whole cell, so thin features and tangencies between corners aren't missed
+        bounds: Interval = evaluate_interval(std_form,
+                                             x=Interval(x_bounds[0] + i0 * x_step, x_bounds[0] + i1 * x_step),
+                                             y=Interval(y_bounds[0] + j0 * y_step, y_bounds[0] + j1 * y_step))
+        with numpy.errstate(invalid="ignore"):
+            # The curve may pass through if the corners change sign or zero can't be ruled out
+            keep = (low <= 0) & (high >= 0) | bounds.contains_zero()
+        j0, i0 = j0[keep], i0[keep]
+        if size > 1 and len(j0) * size * size > QUADTREE_DENSE * rows * columns:  # Too dense to be worth splitting
+            return implicit_grid(equation, x_bounds, y_bounds, resolution), None
+        
+        if size == 1:
+            break
+        size //= 2
+        # Split the kept cells into quarters, dropping quarters past the edge of the graph
+        j0 = numpy.concatenate((j0, j0, j0 + size, j0 + size))
+        i0 = numpy.concatenate((i0, i0 + size, i0, i0 + size))
+        inside = (j0 < rows) & (i0 < columns)
+        j0, i0 = j0[inside], i0[inside]
+    
+    cells = numpy.zeros((rows, columns), dtype=bool)
+    cells[j0, i0] = True
+    return values, cells
+
+
+def tangent_polylines(values: numpy.ndarray, cells: numpy.ndarray | None, x_bounds, y_bounds) -> list[list[tuple]]:
+    """
+    Marching squares can't see a curve that touches zero without changing sign, e.g. x^2 = 0
+    Joins the centres of neighbouring cells that may hold the curve but have no sign change,
+    ignoring those next to a sign change, which are only near the curve
+    Without a mask of cells from adaptive_grid nothing can be found
+    """
+    if cells is None:
+        return []
+    rows, columns = cells.shape
+    x_step, y_step = (x_bounds[1] - x_bounds[0]) / columns, (y_bounds[1] - y_bounds[0]) / rows
+    j, i = numpy.nonzero(cells)
+    corners = numpy.stack((values[j, i], values[j, i + 1], values[j + 1, i + 1], values[j + 1, i]))
+    positive = corners > 0
+    crossing = numpy.zeros((rows + 2, columns + 2), dtype=bool)  # Padded so neighbours are never out of range
+    crossing[j + 1, i + 1] = positive.any(axis=0) & ~positive.all(axis=0)
+    
+    near_crossing = numpy.zeros(len(j), dtype=bool)
+    for dj in (-1, 0, 1):
+        for di in (-1, 0, 1):
+            near_crossing |= crossing[j + 1 + dj, i + 1 + di]
+    with numpy.errstate(invalid="ignore"):
+        # Loose interval bounds also keep cells far from zero, so the corners must come within a cell's change of it
+        touches = numpy.fabs(corners).min(axis=0) <= corners.max(axis=0) - corners.min(axis=0)
+    j, i = j[~near_crossing & touches], i[~near_crossing & touches]
+    tangent = numpy.zeros((rows + 2, columns + 2), dtype=bool)
+    tangent[j + 1, i + 1] = True
+    
+    polylines: list[list[tuple]] = []
+    joined = numpy.zeros(len(j), dtype=bool)
+    for dj, di in ((0, 1), (1, -1), (1, 0), (1, 1)):  # Each pair of neighbours is only joined once
+        has_neighbour = tangent[j + 1 + dj, i + 1 + di]
+        joined |= has_neighbour | tangent[j + 1 - dj, i + 1 - di]
+        starts = numpy.stack((x_bounds[0] + (i + 0.5) * x_step, y_bounds[0] + (j + 0.5) * y_step), axis=1)
+        ends = starts + (di * x_step, dj * y_step)
+        polylines += [[tuple(a), tuple(b)] for a, b in zip(starts[has_neighbour].tolist(), ends[has_neighbour].tolist())]
+    for lone_j, lone_i in zip(j[~joined].tolist(), i[~joined].tolist()):  # Single points, e.g. x^2 + y^2 = 0
+        y: float = y_bounds[0] + (lone_j + 0.5) * y_step
+        polylines.append([(x_bounds[0] + lone_i * x_step, y), (x_bounds[0] + (lone_i + 1) * x_step, y)])
+    return polylines
+
+
+def trace_polylines(values: numpy.ndarray, cells: numpy.ndarray | None,
+                    x_bounds, y_bounds) -> list[list[tuple[float, float]]]:
+    """
+    Traces the sign changes of a lattice into connected polylines with sub-pixel vertices, in graph coordinates
+    """
+    segments: numpy.ndarray = contour_segments(values, cells)
+    if not len(segments):
+        return []
+    
+    # Renumber the crossed edges 0..N so each one has a single interpolated vertex
+    ids, inverse = numpy.unique(segments, return_inverse=True)
+    vertices: list = edge_vertices(values, ids, x_bounds, y_bounds).tolist()
+    return [[tuple(vertices[v]) for v in chain] for chain in link_segments(inverse.reshape(segments.shape))]
+
+
+def implicit_polylines(equation: tuple[str, str], x_bounds, y_bounds, resolution,
+                       adaptive: bool = True) -> list[list[tuple[float, float]]]:
+    """
+    Traces an implicit relation into connected polylines with sub-pixel vertices, in graph coordinates
+    Adaptive tracing only evaluates around the curve and also finds tangencies, unless the curve fills the graph,
+    otherwise every pixel corner is evaluated
+    """
+    if adaptive:
+        values, cells = adaptive_grid(equation, x_bounds, y_bounds, resolution)
+        return trace_polylines(values, cells, x_bounds, y_bounds) + \
+            tangent_polylines(values, cells, x_bounds, y_bounds)
+    return trace_polylines(implicit_grid(equation, x_bounds, y_bounds, resolution), None, x_bounds, y_bounds)
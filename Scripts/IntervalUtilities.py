@@ -0,0 +1,118 @@
+from math import pi, inf
+from types import CodeType
+
+import numpy
+
+from Classes.Interval import Interval
+from Scripts.GraphUtilities import compile_expression
+from Scripts.VectorUtilities import vector_gamma
+
+GAMMA_MIN: tuple[float, float] = 1.4616321449683622, 0.8856031944108887  # Minimum of gamma for x > 0
+
+
+def interval_sin(x: Interval) -> Interval:
+    """
+    Sine of each interval, reaching 1 or -1 if a peak or trough lies inside it
+    """
+    x = Interval.of(x)
+    with numpy.errstate(invalid="ignore"):
+        # Number of peaks (pi/2 + 2k*pi) and troughs (-pi/2 + 2k*pi) between lo and hi
+        has_peak = numpy.floor((x.hi - pi / 2) / (2 * pi)) >= numpy.ceil((x.lo - pi / 2) / (2 * pi))
+        has_trough = numpy.floor((x.hi + pi / 2) / (2 * pi)) >= numpy.ceil((x.lo + pi / 2) / (2 * pi))
+        ends = numpy.sin(x.lo), numpy.sin(x.hi)
+    low = numpy.where(has_trough, -1, numpy.fmin(*ends))
+    high = numpy.where(has_peak, 1, numpy.fmax(*ends))
+    return Interval(low, high)
+
+
+def interval_cos(x: Interval) -> Interval:
+    return interval_sin(Interval.of(x) + pi / 2)
+
+
+def interval_tan(x: Interval) -> Interval:
+    """
+    Tangent of each interval, unbounded if an asymptote (pi/2 + k*pi) lies inside it
+    """
+    x = Interval.of(x)
+    with numpy.errstate(invalid="ignore"):
+        has_asymptote = numpy.floor((x.hi - pi / 2) / pi) >= numpy.ceil((x.lo - pi / 2) / pi)
+    return Interval(numpy.where(has_asymptote, -inf, numpy.tan(x.lo)),
+                    numpy.where(has_asymptote, inf, numpy.tan(x.hi)))
+
+
+def increasing(function, low: float = -inf, high: float = inf):
+    """
+    Lifts an increasing function on the domain [low, high] to intervals
+    """
+    def interval_function(x: Interval) -> Interval:
+        x = Interval.of(x).clip(low, high)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return Interval(function(x.lo), function(x.hi))
+    return interval_function
+
+
+def interval_acos(x: Interval) -> Interval:
+    x = Interval.of(x).clip(-1, 1)
+    return Interval(numpy.arccos(x.hi), numpy.arccos(x.lo))  # Decreasing
+
+
+def interval_fabs(x: Interval) -> Interval:
+    x = Interval.of(x)
+    low = numpy.where(x.contains_zero(), 0, numpy.fmin(numpy.fabs(x.lo), numpy.fabs(x.hi)))
+    return Interval(low, numpy.fmax(numpy.fabs(x.lo), numpy.fabs(x.hi)))
+
+
+def positive_gamma(x: Interval) -> Interval:
+    """
+    Gamma of intervals with lo > 0, where it falls to GAMMA_MIN then rises
+    """
+    ends = numpy.nan_to_num(vector_gamma(x.lo), nan=inf), numpy.nan_to_num(vector_gamma(x.hi), nan=inf)
+    with numpy.errstate(invalid="ignore"):
+        has_min = (x.lo <= GAMMA_MIN[0]) & (x.hi >= GAMMA_MIN[0])
+    return Interval(numpy.where(has_min, GAMMA_MIN[1], numpy.fmin(*ends)), numpy.fmax(*ends))
+
+
+def interval_gamma(x: Interval) -> Interval:
+    """
+    Gamma of each interval, directly for x > 0 and by reflection, pi / (sin(pi * x) * gamma(1 - x)), for x < 1
+    Intervals reaching both zero and one hold a pole, so they are left unbounded
+    """
+    x = Interval.of(x)
+    with numpy.errstate(all="ignore"):
+        direct: Interval = positive_gamma(x)
+        reflected: Interval = pi / (interval_sin(x * pi) * positive_gamma(1 - x))
+        positive, below_one = x.lo > 0, x.hi < 1
+    low = numpy.where(positive, direct.lo, numpy.where(below_one, reflected.lo, -inf))
+    high = numpy.where(positive, direct.hi, numpy.where(below_one, reflected.hi, inf))
+    empty = numpy.isnan(x.lo)
+    low[empty], high[empty] = numpy.nan, numpy.nan
+    return Interval(low, high)
+
+
+def interval_gamma_shift(x: Interval) -> Interval:
+    return interval_gamma(Interval.of(x) + 1)
+
+
+# Mirrors eval_dict, but every function takes and returns intervals
+interval_dict: dict = {
+    "sin": interval_sin, "cos": interval_cos, "tan": interval_tan,
+    "asin": increasing(numpy.arcsin, -1, 1), "acos": interval_acos, "atan": increasing(numpy.arctan),
+    "sqrt": increasing(numpy.sqrt, 0), "fabs": interval_fabs,
+    "log": increasing(numpy.log, 0), "log10": increasing(numpy.log10, 0),
+    "gamma": interval_gamma, "gamma_shift": interval_gamma_shift
+}
+
+
+def evaluate_interval(expression: str | CodeType, **variables: Interval) -> Interval:
+    """
+    Bounds every value a formatted expression takes over boxes of x and/or y
+    If the expression can't be bounded, e.g. 1/0 as a literal, the bounds are left infinite
+    """
+    code: CodeType = compile_expression(expression) if isinstance(expression, str) else expression
+    shape: tuple = numpy.broadcast_shapes(*(numpy.shape(v.lo) for v in variables.values()))
+    try:
+        with numpy.errstate(all="ignore"):
+            bounds: Interval = Interval.of(eval(code, dict(interval_dict, **variables)))
+    except (ArithmeticError, ValueError, TypeError, OverflowError):
+        return Interval(numpy.full(shape, -inf), numpy.full(shape, inf))
+    return Interval(numpy.broadcast_to(bounds.lo, shape), numpy.broadcast_to(bounds.hi, shape))
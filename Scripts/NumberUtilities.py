@@ -1,6 +1,9 @@
-from math import fabs
+from math import fabs, floor, ceil, log10
+from functools import lru_cache
 from sigfig import round
 
+NICE_STEPS: tuple = 1, 2, 5  # Multiples of a power of ten the ticks on the graph are spaced by
+
 
 def mantissa(num: float) -> float:
     """
@@ -11,6 +14,7 @@ def mantissa(num: float) -> float:
     return fabs(float(str(num).replace('.', "").rstrip('0')))
 
 
+@lru_cache(maxsize=1024)  # The same labels are formatted again on every pan and zoom
 def d_round(num: float, dec_places: int = 0) -> str:
     """
     Dynamically rounds specifically for the numbers that are displayed on the bounds and graph
@@ -25,3 +29,40 @@ def d_round(num: float, dec_places: int = 0) -> str:
     if a_num > 1E-1:
         return str(round(num, decimals=min(5, dec_places), notation="standard"))
     return str(round(num, decimals=min(5, dec_places), notation="scientific"))
+
+
+def nice_ticks(bounds: tuple[float, float], max_ticks: int) -> tuple[list[float], int]:
+    """
+    The ticks within bounds, spaced by the smallest of NICE_STEPS times a power of ten that gives at most max_ticks
+    Only the visible ticks are generated, however far the bounds are from 0
+    Returns the ticks and the exponent of the step's power of ten, which is their precision
+    """
+    raw_step: float = (bounds[1] - bounds[0]) / max(max_ticks, 1)
+    if not raw_step > 0:
+        return [], 0
+    exponent: int = floor(log10(raw_step))
+    multiple: int = next((m for m in NICE_STEPS if m * 10.0**exponent >= raw_step), 0)
+    if not multiple:  # Rounded up to the next power of ten
+        exponent, multiple = exponent + 1, 1
+    # Divided by negative powers of ten, 10 is exact where 0.1 isn't, so ticks like 0.3 come out exact
+    numerator, denominator = (multiple * 10.0**exponent, 1) if exponent >= 0 else (multiple, 10.0**-exponent)
+    return [i * numerator / denominator for i in range(ceil(bounds[0] * denominator / numerator),
+                                                       floor(bounds[1] * denominator / numerator) + 1)], exponent
+
+
+def tick_labels(ticks: list[float], exponent: int) -> list[str]:
+    """
+    Formats the ticks of an axis from nice_ticks to the precision of their step, in the notation d_round would use
+    The notation and digits are chosen by the largest tick, so every label on the axis reads alike
+    """
+    largest: float = max((fabs(tick) for tick in ticks), default=0)
+    labels: list[str] = []
+    for tick in ticks:
+        if fabs(tick) < 0.5 * 10.0**exponent:  # 0, give or take rounding
+            labels.append('0')
+        elif 1E-1 <= largest < 1E4:
+            labels.append(f"{tick:.{max(-exponent, 0)}f}")
+        else:
+            mantissa_text, power = f"{tick:.{max(floor(log10(largest)) - exponent, 0)}E}".split('E')
+            labels.append(f"{mantissa_text}E{int(power)}")
+    return labels
@@ -0,0 +1,270 @@
+from math import *
+import re
+
+# Names the user can type, and the function or constant each one stands for
+FUNCTION_NAMES: dict = {
+    "sin": "sin", "cos": "cos", "tan": "tan", "sec": "sec", "csc": "csc", "cosec": "csc", "cot": "cot",
+    "asin": "asin", "acos": "acos", "atan": "atan", "arcsin": "asin", "arccos": "acos", "arctan": "atan",
+    "sqrt": "sqrt", "abs": "fabs", "fabs": "fabs", "log": "log10", "ln": "log",
+    "fact": "gamma_shift", "factorial": "gamma_shift", "gamma": "gamma"
+}
+CONSTANT_NAMES: dict = {"pi": pi, "e": e}
+VARIABLE_NAMES: tuple = ('x', 'y')
+# Reciprocal trig functions are rewritten in terms of the ones every backend has
+RECIPROCALS: dict = {"sec": "cos", "csc": "sin", "cot": "tan"}
+
+# Longest names first, so "cosec" isn't read as "cos" followed by "ec"
+WORDS: list = sorted(list(FUNCTION_NAMES) + list(CONSTANT_NAMES) + list(VARIABLE_NAMES), key=len, reverse=True)
+TOKEN_PATTERN = re.compile(r"\s*(?:(\d+\.?\d*|\.\d+)|(\$[mn])|([a-zA-Z])|(\S))")
+
+
+def gamma_shift_value(x: float) -> float:
+    return gamma(x + 1)
+
+
+# Functions used to fold constant parts of an equation
+FOLD_FUNCTIONS: dict = {
+    "sin": sin, "cos": cos, "tan": tan, "asin": asin, "acos": acos, "atan": atan, "sqrt": sqrt, "fabs": fabs,
+    "log": log, "log10": log10, "gamma": gamma, "gamma_shift": gamma_shift_value
+}
+
+
+def tokenize(text: str, m: float = 0, n: float = 0) -> list[tuple[str, object]]:
+    """
+    Splits an equation into (kind, value) tokens: num, var, func, op
+    Runs of letters are split into known names, e.g. "sinx" is sin then x
+    Raises NameError for letters that aren't part of a known name,
+    and SyntaxError for numbers with two decimal points or too large for a float
+    """
+    tokens: list[tuple[str, object]] = []
+    position: int = 0
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        if not match:  # Only whitespace is left
+            break
+        number, variable, letter, symbol = match.groups()
+        if number:
+            if text.startswith('.', match.end()):  # e.g. 2.5.3, which would be read as 2.5 * 0.3
+                raise SyntaxError(f"Malformed number at: {text[match.start(1):]}")
+            if not isfinite(float(number)):
+                raise SyntaxError(f"Number too large: {number}")
+            tokens.append(("num", float(number)))
+            position = match.end()
+        elif variable:
+            value = m if variable == "$m" else n
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise TypeError(f"{variable} is not a number")
+            tokens.append(("num", float(value)))
+            position = match.end()
+        elif letter:
+            start: int = match.start(3)
+            for word in WORDS:
+                if text.startswith(word, start):
+                    break
+            else:
+                raise NameError(f"Unknown name at: {text[start:]}")
+            if word in FUNCTION_NAMES:
+                tokens.append(("func", FUNCTION_NAMES[word]))
+            elif word in CONSTANT_NAMES:
+                tokens.append(("num", CONSTANT_NAMES[word]))
+            else:
+                tokens.append(("var", word))
+            position = start + len(word)
+        else:
+            if symbol not in "+-*/^()=":
+                raise SyntaxError(f"Unexpected symbol: {symbol}")
+            tokens.append(("op", symbol))
+            position = match.end()
+    return tokens
+
+
+class Parser:
+    """
+    Recursive descent parser turning tokens into an AST of nested tuples:
+    ("num", value), ("var", name), ("call", function, argument), ("neg", a) and (operator, a, b)
+    Multiplication can be implied, e.g. 2x, x(x + 1), 10sinx and sin2x = sin(2x)
+    """
+    def __init__(self, tokens: list[tuple[str, object]]):
+        self.tokens: list[tuple[str, object]] = tokens
+        self.index: int = 0
+
+    def peek(self) -> tuple[str, object] | None:
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def take(self, expected: str | None = None) -> tuple[str, object]:
+        token = self.peek()
+        if token is None or expected is not None and token != ("op", expected):
+            raise SyntaxError(f"Expected {expected or 'more'} at token {self.index}")
+        self.index += 1
+        return token
+
+    def starts_primary(self) -> bool:
+        token = self.peek()
+        return token is not None and (token[0] in ("num", "var", "func") or token == ("op", '('))
+
+    def equation(self) -> tuple[tuple, tuple]:
+        lhs: tuple = self.expression()
+        self.take('=')
+        rhs: tuple = self.expression()
+        if self.peek() is not None:
+            raise SyntaxError(f"Unexpected {self.peek()[1]}")
+        return lhs, rhs
+
+    def expression(self) -> tuple:
+        node: tuple = self.term()
+        while self.peek() in (("op", '+'), ("op", '-')):
+            operator = self.take()[1]
+            node = (operator, node, self.term())
+        return node
+
+    def term(self) -> tuple:
+        node: tuple = self.unary()
+        while True:
+            if self.peek() in (("op", '*'), ("op", '/')):
+                operator = self.take()[1]
+                node = (operator, node, self.unary())
+            elif self.starts_primary():  # Implied multiplication
+                node = ('*', node, self.power())
+            else:
+                return node
+
+    def unary(self) -> tuple:
+        if self.peek() == ("op", '-'):
+            self.take()
+            return "neg", self.unary()
+        if self.peek() == ("op", '+'):
+            self.take()
+            return self.unary()
+        return self.power()
+
+    def power(self) -> tuple:
+        node: tuple = self.primary()
+        if self.peek() == ("op", '^'):
+            self.take()
+            return '^', node, self.unary()  # Right associative, and 2^-x is allowed
+        return node
+
+    def primary(self) -> tuple:
+        token = self.take()
+        if token[0] in ("num", "var"):
+            return token
+        if token == ("op", '('):
+            node: tuple = self.expression()
+            self.take(')')
+            return node
+        if token[0] == "func":
+            if self.peek() == ("op", '('):
+                argument: tuple = self.primary()
+            else:  # e.g. sinx, sin2x or sin2pix, the argument is a coefficient and plain symbols
+                argument = self.take()
+                if argument[0] not in ("num", "var"):
+                    raise SyntaxError(f"Missing argument to {token[1]}")
+                while self.peek() is not None and self.peek()[0] in ("num", "var"):
+                    argument = ('*', argument, self.take())
+            if token[1] in RECIPROCALS:
+                return '/', ("num", 1.0), ("call", RECIPROCALS[token[1]], argument)
+            return "call", token[1], argument
+        raise SyntaxError(f"Unexpected {token[1]}")
+
+
+def fold(node: tuple) -> tuple:
+    """
+    Evaluates every part of the AST that doesn't depend on x or y, and removes operations that do nothing
+    Parts that fail to evaluate, e.g. 1/0, are left for the backends to handle
+    """
+    kind = node[0]
+    if kind in ("num", "var"):
+        return node
+    if kind == "neg":
+        inner: tuple = fold(node[1])
+        return ("num", -inner[1]) if inner[0] == "num" else ("neg", inner)
+    if kind == "call":
+        argument: tuple = fold(node[2])
+        if argument[0] == "num":
+            try:
+                return "num", float(FOLD_FUNCTIONS[node[1]](argument[1]))
+            except (ArithmeticError, ValueError, TypeError):
+                pass
+        return "call", node[1], argument
+
+    a, b = fold(node[1]), fold(node[2])
+    if a[0] == "num" and b[0] == "num":
+        try:
+            value = {'+': a[1] + b[1], '-': a[1] - b[1]}[kind] if kind in "+-" else \
+                a[1] * b[1] if kind == '*' else a[1] / b[1] if kind == '/' else a[1] ** b[1]
+            if isinstance(value, float) and isfinite(value):  # Complex powers are left to the backends
+                return "num", value
+        except (ArithmeticError, ValueError, TypeError):
+            pass
+    # Identities, e.g. x * 1 = x, x + 0 = x, x ^ 1 = x
+    if kind in "+-" and b == ("num", 0.0) or kind in "*/^" and b == ("num", 1.0):
+        return a
+    if kind == '+' and a == ("num", 0.0) or kind == '*' and a == ("num", 1.0):
+        return b
+    return kind, a, b
+
+
+def count_subexpressions(node: tuple, counts: dict) -> None:
+    """
+    Counts the repeats of each operation, without looking inside the repeats of a repeated one
+    """
+    if node[0] in ("num", "var"):
+        return None
+    counts[node] = counts.get(node, 0) + 1
+    if counts[node] == 1:
+        for child in node[1:]:
+            if isinstance(child, tuple):
+                count_subexpressions(child, counts)
+    return None
+
+
+def to_source(node: tuple, shared: dict) -> str:
+    """
+    Writes the AST as Python, x and y are written as (x) and (y)
+    Repeated operations are stored in a variable the first time they are evaluated and reused afterwards,
+    Python evaluates left to right, so the first one written is always the first one evaluated
+    """
+    kind = node[0]
+    if kind == "num":
+        return f"({node[1]!r})" if node[1] < 0 else repr(node[1])
+    if kind == "var":
+        return f"({node[1]})"
+    if node in shared and shared[node][1]:  # Already evaluated
+        return shared[node][0]
+
+    if kind == "neg":
+        source: str = f"(-{to_source(node[1], shared)})"
+    elif kind == "call":
+        source = f"{node[1]}({to_source(node[2], shared)})"
+    else:
+        operator: str = "**" if kind == '^' else kind
+        source = f"({to_source(node[1], shared)} {operator} {to_source(node[2], shared)})"
+
+    if node in shared:
+        name: str = shared[node][0]
+        shared[node] = name, True
+        return f"({name} := {source})"
+    return source
+
+
+def compile_source(node: tuple) -> str:
+    """
+    Turns one side of an equation into Python, with constants folded and common subexpressions computed once
+    """
+    node = fold(node)
+    counts: dict = {}
+    count_subexpressions(node, counts)
+    shared: dict = {}  # Node: (variable name, if it has been written)
+    for repeated in (sub for sub, count in counts.items() if count > 1):
+        shared[repeated] = f"_s{len(shared)}", False
+    source: str = to_source(node, shared)
+    return source[1:-1] if node[0] not in ("num", "var", "call") else source  # Drop the outermost brackets
+
+
+def parse_equation(equation: str, m: float = 0, n: float = 0) -> tuple[str, str]:
+    """
+    Parses an equation typed by the user into the Python source of each of its sides
+    Raises SyntaxError, NameError or TypeError if it isn't a valid equation
+    """
+    lhs, rhs = Parser(tokenize(equation, m, n)).equation()
+    return compile_source(lhs), compile_source(rhs)
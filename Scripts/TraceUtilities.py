@@ -0,0 +1,154 @@
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from cProfile import Profile
+from threading import get_ident, current_thread
+from time import perf_counter
+from json import dump
+from os import getpid
+
+TRACE_FRAMES: int = 240  # Frames kept for the trace dump, two seconds at the default tick
+STATS_FRAMES: int = 120  # Frames the overlay's averages are taken over
+
+frames: deque = deque(maxlen=TRACE_FRAMES)  # Events of each finished frame, oldest first
+current: list = []  # Events of the frame in progress: (name, thread, start, duration, args)
+frame_start: float = perf_counter()
+frame_times: deque = deque(maxlen=STATS_FRAMES)  # (seconds since the last frame started, seconds of work, start)
+thread_names: dict = {}  # Thread ident: name, shown in the trace viewer
+render_starts: dict = {}  # Function index: time its render was requested
+latencies: dict = {}  # Function index: seconds from request until its last pass was ready
+profile: Profile | None = None
+profile_frames: int = 0  # Frames left before the profile is saved
+profile_file: str = ""
+
+
+def record(name: str, start: float, duration: float, args: dict | None = None) -> None:
+    """
+    Adds a finished stage to the current frame
+    """
+    ident: int = get_ident()
+    if ident not in thread_names:
+        thread_names[ident] = current_thread().name
+    current.append((name, ident, start, duration, args))
+    return None
+
+
+@contextmanager
+def span(name: str, **args):
+    """
+    Times the stage run inside the with block
+    """
+    start: float = perf_counter()
+    try:
+        yield None
+    finally:
+        record(name, start, perf_counter() - start, args or None)
+
+
+def traced(name: str):
+    """
+    Decorator timing every call of a function as a stage
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start: float = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, start, perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def begin_frame() -> None:
+    global frame_start
+    frame_start = perf_counter()
+    return None
+
+
+def end_frame() -> None:
+    """
+    Closes the current frame, call it before waiting for the next tick so idle time isn't counted as work
+    """
+    global current, profile, profile_frames
+    end: float = perf_counter()
+    record("frame", frame_start, end - frame_start)
+    frames.append(current)
+    current = []
+    last_start: float = frame_times[-1][2] if frame_times else frame_start
+    frame_times.append((frame_start - last_start, end - frame_start, frame_start))
+
+    if profile is not None:
+        profile_frames -= 1
+        if profile_frames <= 0:
+            profile.disable()
+            profile.dump_stats(profile_file)
+            print(f"Saved profile to {profile_file}")
+            profile = None
+    return None
+
+
+def start_render(idx: int) -> None:
+    render_starts[idx] = perf_counter()
+    return None
+
+
+def finish_render(idx: int) -> None:
+    """
+    Stores the latency of a function's render, from when it was requested to when its last pass was ready
+    """
+    if idx in render_starts:
+        latencies[idx] = perf_counter() - render_starts.pop(idx)
+    return None
+
+
+def frame_stats() -> tuple[float, float]:
+    """
+    The mean milliseconds of work per frame and the frames per second, over the last STATS_FRAMES frames
+    """
+    if len(frame_times) < 2:
+        return 0, 0
+    intervals: list[float] = [frame[0] for frame in list(frame_times)[1:]]
+    busy: float = sum(frame[1] for frame in frame_times) / len(frame_times)
+    return busy * 1000, len(intervals) / sum(intervals) if sum(intervals) else 0
+
+
+def stage_times() -> dict[str, float]:
+    """
+    The mean milliseconds per frame spent in each stage, over the last STATS_FRAMES frames
+    """
+    recent: list = list(frames)[-STATS_FRAMES:]
+    totals: dict[str, float] = {}
+    for events in recent:
+        for name, _, _, duration, _ in events:
+            if name != "frame":
+                totals[name] = totals.get(name, 0) + duration
+    return {name: total * 1000 / max(len(recent), 1) for name, total in totals.items()}
+
+
+def dump_chrome_trace(file: str) -> None:
+    """
+    Saves the kept frames in the Chrome trace format, opened with chrome://tracing or Perfetto
+    """
+    events: list[dict] = [{"name": "thread_name", "ph": 'M', "pid": getpid(), "tid": ident, "args": {"name": name}}
+                          for ident, name in thread_names.items()]
+    for frame in list(frames):
+        for name, ident, start, duration, args in frame:
+            events.append({"name": name, "ph": 'X', "pid": getpid(), "tid": ident, "ts": start * 1E6,
+                           "dur": duration * 1E6, "args": args or {}})
+    with open(file, 'w') as trace_file:
+        dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+    return None
+
+
+def start_profile(file: str, frame_count: int = TRACE_FRAMES) -> None:
+    """
+    Profiles the main thread with cProfile for the next frames, then saves the stats to a file for pstats or snakeviz
+    """
+    global profile, profile_frames, profile_file
+    if profile is not None:  # Already profiling
+        return None
+    profile, profile_frames, profile_file = Profile(), frame_count, file
+    profile.enable()
+    return None
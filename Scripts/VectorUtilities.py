@@ -0,0 +1,116 @@
+from math import gamma, nan
+from itertools import chain
+from types import CodeType
+
+import numpy
+
+from Scripts.GraphUtilities import compile_expression
+
+
+def safe_gamma(x: float) -> float:
+    """
+    The gamma function, but returns NaN instead of raising for points outside of its domain
+    """
+    try:
+        return gamma(x)
+    except (ArithmeticError, ValueError, OverflowError):
+        return nan
+
+
+vector_gamma = numpy.vectorize(safe_gamma, otypes=[float])
+
+
+def vector_gamma_shift(x: numpy.ndarray) -> numpy.ndarray:
+    """
+    Vectorized factorial function, see gamma_shift
+    """
+    return vector_gamma(x + 1)
+
+
+# Mirrors eval_dict, but every function takes and returns whole arrays
+vector_dict: dict = {
+    "sin": numpy.sin, "cos": numpy.cos, "tan": numpy.tan,
+    "asin": numpy.arcsin, "acos": numpy.arccos, "atan": numpy.arctan,
+    "sqrt": numpy.sqrt, "fabs": numpy.fabs, "log": numpy.log, "log10": numpy.log10,
+    "gamma": vector_gamma, "gamma_shift": vector_gamma_shift
+}
+
+
+def evaluate_vector(expression: str | CodeType, **variables: numpy.ndarray) -> numpy.ndarray:
+    """
+    Evaluates a formatted expression over whole arrays of x and/or y in one go
+    Points out of the function's domain, divisions by zero and overflows are returned as NaN
+    """
+    code: CodeType = compile_expression(expression) if isinstance(expression, str) else expression
+    shape: tuple = numpy.broadcast_shapes(*(numpy.shape(v) for v in variables.values()))
+
+    with numpy.errstate(all="ignore"):  # Domain errors become NaN or inf instead of warnings
+        try:
+            values = numpy.asarray(eval(code, dict(vector_dict, **variables)), dtype=float)
+        except (ArithmeticError, ValueError, TypeError, OverflowError):  # e.g. 1/0 written as a literal
+            return numpy.full(shape, nan)
+
+    if values.shape != shape:  # Expression is constant, e.g. y = 5
+        values = numpy.broadcast_to(values, shape).copy()
+    values[~numpy.isfinite(values)] = nan
+    return values
+
+
+def graph_to_pixels(points: numpy.ndarray, x_bounds: tuple[float, float], y_bounds: tuple[float, float],
+                    stretch: tuple[float, float]) -> numpy.ndarray:
+    """
+    Vectorized Grapher.graph_to_surface, transforms rows of (x, y) to points on a surface the size of the graph
+    """
+    return numpy.column_stack(((points[:, 0] - x_bounds[0]) * stretch[0], (y_bounds[1] - points[:, 1]) * stretch[1]))
+
+
+def pack_polylines(polylines: list[list[tuple[float, float]]]) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Packs polylines into one (N, 2) array of every vertex and an array of each polyline's length,
+    the form tiles are shared, cached and drawn in
+    """
+    lengths: numpy.ndarray = numpy.fromiter(map(len, polylines), dtype=numpy.int64, count=len(polylines))
+    vertices: numpy.ndarray = numpy.fromiter(chain.from_iterable(chain.from_iterable(polylines)), dtype=float,
+                                             count=2 * int(lengths.sum())).reshape(-1, 2)
+    return vertices, lengths
+
+
+def join_polylines(packed: list[tuple[numpy.ndarray, numpy.ndarray]]) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Joins packed polylines, e.g. of several tiles, into one
+    """
+    if not packed:
+        return numpy.empty((0, 2)), numpy.empty(0, dtype=numpy.int64)
+    return numpy.concatenate([vertices for vertices, _ in packed]), numpy.concatenate([lengths for _, lengths in packed])
+
+
+def polyline_strokes(polylines: tuple[numpy.ndarray, numpy.ndarray], x_bounds: tuple[float, float],
+                     y_bounds: tuple[float, float], stretch: tuple[float, float]) -> list[list]:
+    """
+    Converts packed polylines to pixel coordinates on the graph in one step, returning the parts inside the graph
+    A vertex in the same pixel as the one before it is dropped, antialiased segments shorter than a pixel come out dark
+    """
+    points, lengths = polylines
+    if not len(points):
+        return []
+    first: numpy.ndarray = numpy.zeros(len(points), dtype=bool)  # The first vertex of each polyline
+    polyline_starts: numpy.ndarray = numpy.cumsum(lengths)[:-1]
+    first[polyline_starts[polyline_starts < len(points)]] = True
+    first[0] = True
+
+    inside: numpy.ndarray = (x_bounds[0] <= points[:, 0]) & (points[:, 0] <= x_bounds[1]) & \
+        (y_bounds[0] <= points[:, 1]) & (points[:, 1] <= y_bounds[1])
+    pixels: numpy.ndarray = graph_to_pixels(points, x_bounds, y_bounds, stretch)
+    cells: numpy.ndarray = numpy.floor(pixels)
+    # Strokes break wherever a polyline starts or leaves the graph
+    runs: numpy.ndarray = numpy.cumsum(first | ~inside)
+    new_cell: numpy.ndarray = numpy.ones(len(points), dtype=bool)
+    new_cell[1:] = (cells[1:] != cells[:-1]).any(axis=1) | (runs[1:] != runs[:-1])
+    last: numpy.ndarray = numpy.ones(len(points), dtype=bool)  # Ends of runs are kept, so strokes reach their ends
+    last[:-1] = runs[1:] != runs[:-1]
+    kept: numpy.ndarray = numpy.flatnonzero(inside & (new_cell | last))
+
+    ends: list[int] = (numpy.flatnonzero(numpy.diff(runs[kept])) + 1).tolist()
+    kept_pixels: list = pixels[kept].tolist()
+    return [stroke for stroke in (kept_pixels[start:end] for start, end in zip([0] + ends, ends + [len(kept)]))
+            if len(stroke) > 1]
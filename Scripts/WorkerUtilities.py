@@ -0,0 +1,233 @@
+from multiprocessing import get_context
+from multiprocessing.sharedctypes import SynchronizedArray
+from multiprocessing.pool import Pool, AsyncResult
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count, getpid
+from math import floor, ceil
+
+import numpy
+
+from Scripts.ImplicitUtilities import QUADTREE_START, implicit_polylines, implicit_grid, adaptive_grid, \
+    trace_polylines, tangent_polylines
+from Scripts.ExplicitUtilities import explicit_strokes
+from Scripts.VectorUtilities import pack_polylines
+
+WORKERS: int = cpu_count() or 1  # Default number of processes rendering relations
+EXPLICIT_WORKERS: int = 1  # Processes sampling explicit functions, kept apart so they never wait behind relations
+TILE_SIZES: tuple = 4 * QUADTREE_START, 16 * QUADTREE_START  # Smallest and largest tiles in pixels, powers of two
+PROGRESSIVE_SCALES: tuple = 8, 4, 2, 1  # Each tile is shown at 1/8 of the resolution first, then finer passes
+TOKEN_SLOTS: int = 256  # Cancellation tokens shared with the workers, each running render holds a slot of its own
+CANCELLED: int = -1  # Generation of a slot whose render was cancelled
+
+tokens: SynchronizedArray | None = None  # The current generation of each slot, set in every worker
+
+
+def preload_worker(shared_tokens: SynchronizedArray | None = None) -> None:
+    """
+    Runs once in every worker when the pool starts, so the first real render doesn't pay for
+    importing and warming up the evaluation modules
+    """
+    global tokens
+    tokens = shared_tokens
+    implicit_polylines(("(x) ** 2.0 + (y) ** 2.0", "1.0"), (-2, 2), (-2, 2), (QUADTREE_START, QUADTREE_START))
+    explicit_strokes(("(y)", "(x) ** 2.0"), (-2, 2), (-2, 2), (QUADTREE_START, QUADTREE_START))
+    return None
+
+
+def new_tokens() -> SynchronizedArray:
+    """
+    Creates the cancellation tokens, every slot starts cancelled
+    """
+    return get_context("spawn").Array('q', [CANCELLED for _ in range(TOKEN_SLOTS)], lock=False)
+
+
+def start_pool(workers: int = WORKERS, shared_tokens: SynchronizedArray | None = None) -> Pool:
+    """
+    Starts the long-lived pool that renders every function and relation
+    Workers are spawned rather than forked so they never inherit the window or the main loop's threads
+    """
+    return get_context("spawn").Pool(processes=max(workers, 1), initializer=preload_worker,
+                                     initargs=(shared_tokens,))
+
+
+def zoom_level(x_bounds, y_bounds, resolution) -> tuple[float, float, int]:
+    """
+    The graph units per pixel on each axis, rounded so the same zoom is recognised after panning,
+    and the width of tiles in pixels, between an eighth and a quarter of the graph's shorter side within TILE_SIZES,
+    so each render is a few dozen tasks
+    """
+    size: int = TILE_SIZES[0]
+    while size < TILE_SIZES[1] and 8 * size <= min(resolution):
+        size *= 2
+    return float(f"{(x_bounds[1] - x_bounds[0]) / resolution[0]:.12g}"), \
+        float(f"{(y_bounds[1] - y_bounds[0]) / resolution[1]:.12g}"), size
+
+
+def visible_tiles(x_bounds, y_bounds, zoom: tuple[float, float, int]) -> list[tuple[int, int]]:
+    """
+    Indices of the tiles covering the graph, tiles are anchored to the origin,
+    so panning keeps the tiles that are still in view
+    """
+    width, height = zoom[2] * zoom[0], zoom[2] * zoom[1]
+    columns = range(floor(x_bounds[0] / width), ceil(x_bounds[1] / width))
+    rows = range(floor(y_bounds[0] / height), ceil(y_bounds[1] / height))
+    return [(column, row) for row in rows for column in columns]
+
+
+def tile_chunk(equation: tuple[str, str], zoom: tuple[float, float, int], tile: tuple[int, int],
+               scale: int = 1, seed: tuple[str, tuple] | None = None, token: tuple[int, int] | None = None,
+               name: str = "") -> tuple:
+    """
+    The arguments to render_chunk rendering a single tile at 1/scale of the resolution
+    Neighbouring tiles share their boundary pixel corners, so their polylines meet
+    """
+    width, height = zoom[2] * zoom[0], zoom[2] * zoom[1]
+    return (equation, (tile[0] * width, (tile[0] + 1) * width), (tile[1] * height, (tile[1] + 1) * height),
+            (zoom[2] // scale, zoom[2] // scale), seed, scale > 1, token, name)
+
+
+def block_names(generation: int, count: int) -> list[str]:
+    """
+    Names of the shared memory blocks each tile of a pass writes its polylines (name + 'p') and lattice (name + 'l') to
+    They are chosen by the main process, so it can free every block of a pass, even one that failed
+    """
+    return [f"gc{getpid()}_{generation}_{number}" for number in range(count)]
+
+
+def free_block(name: str) -> None:
+    """
+    Frees a shared memory block, if it still exists
+    """
+    try:
+        block = SharedMemory(name=name)
+    except FileNotFoundError:
+        return None
+    block.close()
+    block.unlink()
+    return None
+
+
+def free_blocks(names: list[str]) -> None:
+    """
+    Frees the blocks of every tile of a pass, see block_names
+    """
+    for name in names:
+        free_block(name + 'p')
+        free_block(name + 'l')
+    return None
+
+
+def share_polylines(polylines: list[list[tuple[float, float]]], name: str) -> tuple[str, int, int] | None:
+    """
+    Writes polylines into a new shared memory block: the length of each polyline, then every vertex's x and y
+    Only the block's name and sizes are sent back to the main process
+    """
+    if not polylines:
+        return None
+    vertices, lengths = pack_polylines(polylines)
+    block = SharedMemory(name=name, create=True, size=8 * (len(lengths) + vertices.size))
+    buffer = numpy.ndarray((len(lengths) + vertices.size,), dtype=numpy.float64, buffer=block.buf)
+    buffer[:len(lengths)] = lengths
+    buffer[len(lengths):] = vertices.ravel()
+    del buffer
+    block.close()  # The main process unlinks it after reading
+    return block.name, len(lengths), len(vertices)
+
+
+def read_polylines(handle: tuple[str, int, int] | None) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Reads and frees a block written by share_polylines, returning the packed polylines, see pack_polylines
+    The block is copied out in one go, so it can be freed straight away
+    """
+    if handle is None:
+        return pack_polylines([])
+    name, count, vertex_count = handle
+    block = SharedMemory(name=name)
+    data: numpy.ndarray = numpy.ndarray((count + 2 * vertex_count,), dtype=numpy.float64, buffer=block.buf).copy()
+    block.close()
+    block.unlink()
+    return data[count:].reshape(vertex_count, 2), data[:count].astype(numpy.int64)
+
+
+def share_lattice(values: numpy.ndarray, name: str) -> tuple[str, tuple]:
+    """
+    Writes a tile's lattice into a new shared memory block, to seed the tile's next pass
+    The main process only keeps the block's name and shape, and frees it once the tile no longer needs it
+    """
+    block = SharedMemory(name=name, create=True, size=max(values.nbytes, 1))
+    numpy.ndarray(values.shape, dtype=numpy.float64, buffer=block.buf)[:] = values
+    block.close()
+    return block.name, values.shape
+
+
+def read_lattice(handle: tuple[str, tuple]) -> numpy.ndarray | None:
+    """
+    Reads a block written by share_lattice, None if it was freed meanwhile, e.g. the tile scrolled out of view
+    """
+    try:
+        block = SharedMemory(name=handle[0])
+    except FileNotFoundError:
+        return None
+    values: numpy.ndarray = numpy.ndarray(handle[1], dtype=numpy.float64, buffer=block.buf).copy()
+    block.close()
+    return values
+
+
+def render_chunk(chunk: tuple) -> tuple[tuple[str, int, int] | None, tuple[str, tuple] | None] | None:
+    """
+    Renders a tile, returning its shared polylines and, unless it is at full resolution,
+    its shared lattice to seed the next pass
+    Returns None without rendering if the tile's token (slot, generation) was cancelled or superseded
+    """
+    equation, x_bounds, y_bounds, resolution, seed, coarse, token, name = chunk
+    if token is not None and tokens is not None and tokens[token[0]] != token[1]:
+        return None
+    seed = None if seed is None else read_lattice(seed)
+    if coarse and seed is None:  # The first pass is a quick preview, one call samples the whole small lattice
+        values = implicit_grid(equation, x_bounds, y_bounds, resolution)
+        return share_polylines(trace_polylines(values, None, x_bounds, y_bounds), name + 'p'), \
+            share_lattice(values, name + 'l')
+    values, cells = adaptive_grid(equation, x_bounds, y_bounds, resolution, seed)
+    polylines: list = trace_polylines(values, cells, x_bounds, y_bounds) + \
+        tangent_polylines(values, cells, x_bounds, y_bounds)
+    return share_polylines(polylines, name + 'p'), share_lattice(values, name + 'l') if coarse else None
+
+
+def submit_tiles(pool: Pool, workers: int, equation: tuple[str, str], zoom: tuple[float, float, int],
+                 tiles: list[tuple[int, int]], names: list[str], scale: int = 1, seeds: list[tuple[str, tuple] | None] | None = None,
+                 token: tuple[int, int] | None = None) -> AsyncResult:
+    """
+    Queues tiles of an implicit relation on the pool of workers processes without waiting for them,
+    check the result with ready()
+    Each tile writes its blocks under its name of names, see block_names
+    """
+    chunks: list[tuple] = [tile_chunk(equation, zoom, tile, scale, seed, token, name)
+                           for tile, seed, name in zip(tiles, seeds or [None for _ in tiles], names)]
+    return pool.map_async(render_chunk, chunks, chunksize=max(len(chunks) // (4 * workers), 1))
+
+
+def collect_tiles(result: AsyncResult) -> list[tuple[tuple[numpy.ndarray, numpy.ndarray], tuple | None] | None]:
+    """
+    The packed polylines and shared lattice of each tile of a finished render, None for tiles that were cancelled,
+    freeing the blocks of their polylines
+    """
+    return [None if tile is None else (read_polylines(tile[0]), tile[1]) for tile in result.get()]
+
+
+def render_explicit(job: tuple) -> tuple[numpy.ndarray, list[int]] | None:
+    """
+    Samples and clips an explicit function, returning its strokes as in explicit_strokes
+    Returns None without rendering if the job's token (slot, generation) was cancelled or superseded
+    """
+    equation, x_bounds, y_bounds, resolution, token = job
+    if token is not None and tokens is not None and tokens[token[0]] != token[1]:
+        return None
+    return explicit_strokes(equation, x_bounds, y_bounds, resolution)
+
+
+def submit_explicit(pool: Pool, equation: tuple[str, str], x_bounds, y_bounds, resolution,
+                    token: tuple[int, int] | None = None) -> AsyncResult:
+    """
+    Queues an explicit function on the pool without waiting for it, check the result with ready()
+    """
+    return pool.apply_async(render_explicit, ((equation, x_bounds, y_bounds, resolution, token),))
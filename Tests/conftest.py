@@ -0,0 +1,5 @@
+from os import path
+import sys
+
+# The tests import Classes and Scripts from the project root, as the scripts run from there do
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
@@ -0,0 +1,68 @@
+from math import hypot
+
+import numpy
+import pytest
+
+from Scripts.ImplicitUtilities import implicit_grid, adaptive_grid, link_segments, trace_polylines, implicit_polylines
+
+CIRCLE: tuple[str, str] = ("(x) ** 2.0 + (y) ** 2.0", "9.0")
+
+
+def test_circle_is_closed():
+    values: numpy.ndarray = implicit_grid(CIRCLE, (-5, 5), (-5, 5), (200, 200))
+    polylines: list = trace_polylines(values, None, (-5, 5), (-5, 5))
+    assert len(polylines) == 1
+    assert polylines[0][0] == polylines[0][-1]
+    assert all(hypot(x, y) == pytest.approx(3, abs=0.01) for x, y in polylines[0])
+
+
+def test_curve_leaving_the_graph_is_open():
+    values: numpy.ndarray = implicit_grid(CIRCLE, (0, 5), (-5, 5), (100, 200))
+    polylines: list = trace_polylines(values, None, (0, 5), (-5, 5))
+    assert len(polylines) == 1
+    assert polylines[0][0] != polylines[0][-1]
+    assert sorted((polylines[0][0][1], polylines[0][-1][1])) == pytest.approx([-3, 3])
+
+
+@pytest.mark.parametrize("segments, expected", [
+    # Open chains are walked from one of their ends
+    ([[1, 2], [0, 1]], [[2, 1, 0]]),
+    ([[0, 1], [1, 2], [2, 3], [3, 0]], [[0, 1, 2, 3, 0]]),  # Loops end with their first id
+    ([[0, 1], [2, 3]], [[0, 1], [2, 3]]),
+])
+def test_link_segments(segments: list[list[int]], expected: list[list[int]]):
+    assert link_segments(numpy.array(segments)) == expected
+
+
+def vertex_set(polylines: list) -> set:
+    return {(round(x, 9), round(y, 9)) for polyline in polylines for x, y in polyline}
+
+
+@pytest.mark.parametrize("equation", [
+    CIRCLE,
+    ("(x) * (y)", "1.0"),
+    ("sin((x)) * sin((y))", "0.1"),
+])
+def test_adaptive_matches_full_grid(equation: tuple[str, str]):
+    """
+    The quadtree only skips cells the curve can't pass through, so it traces the same curve as the full lattice
+    """
+    full: list = implicit_polylines(equation, (-5, 5), (-4, 4), (160, 128), adaptive=False)
+    adaptive: list = implicit_polylines(equation, (-5, 5), (-4, 4), (160, 128))
+    assert len(adaptive) == len(full)
+    assert vertex_set(adaptive) == vertex_set(full)
+
+
+def test_adaptive_grid_seed():
+    coarse, _ = adaptive_grid(CIRCLE, (-5, 5), (-5, 5), (64, 64))
+    seeded, cells = adaptive_grid(CIRCLE, (-5, 5), (-5, 5), (128, 128), coarse)
+    unseeded, _ = adaptive_grid(CIRCLE, (-5, 5), (-5, 5), (128, 128))
+    assert vertex_set(trace_polylines(seeded, cells, (-5, 5), (-5, 5))) == \
+        vertex_set(trace_polylines(unseeded, cells, (-5, 5), (-5, 5)))
+
+
+def test_dense_curve_uses_full_grid():
+    equation: tuple[str, str] = ("sin(4.0 * (x)) * sin(4.0 * (y))", "0.0")
+    values, cells = adaptive_grid(equation, (-10, 10), (-10, 10), (128, 128))
+    assert cells is None
+    numpy.testing.assert_array_equal(values, implicit_grid(equation, (-10, 10), (-10, 10), (128, 128)))
@@ -0,0 +1,46 @@
+import numpy
+
+from Classes.TileCache import TileCache, TILE_BYTES
+
+
+def tile(vertices: int) -> tuple[numpy.ndarray, numpy.ndarray]:
+    return numpy.zeros((vertices, 2)), numpy.array([vertices], dtype=numpy.int64)
+
+
+def test_size_is_tracked():
+    cache: TileCache = TileCache()
+    cache.put('a', tile(10))
+    assert cache.size == TILE_BYTES + 10 * 16 + 8
+    cache.put('a', tile(20))  # Replaced, not counted twice
+    assert cache.size == TILE_BYTES + 20 * 16 + 8
+    cache.clear()
+    assert cache.size == 0 and 'a' not in cache
+
+
+def test_least_recently_used_is_evicted():
+    cache: TileCache = TileCache(budget=3 * TileCache.tile_size(tile(10)))
+    for key in "abc":
+        cache.put(key, tile(10))
+    assert cache.get('a') is not None  # 'b' is now the least recently used
+    cache.put('d', tile(10))
+    assert 'b' not in cache and all(key in cache for key in "acd")
+    assert cache.size <= cache.budget
+
+
+def test_large_tile_evicts_several():
+    cache: TileCache = TileCache(budget=3 * TileCache.tile_size(tile(10)))
+    for key in "abc":
+        cache.put(key, tile(10))
+    cache.put('d', tile(30))
+    assert list(cache.tiles) == ['c', 'd'] and cache.size <= cache.budget
+
+
+def test_tile_over_budget_is_kept():
+    """
+    The newest tile is always kept, so the tile just rendered can be drawn
+    """
+    cache: TileCache = TileCache(budget=100)
+    cache.put('a', tile(10))
+    cache.put('b', tile(10))
+    assert list(cache.tiles) == ['b']
+    assert cache.get('a') is None
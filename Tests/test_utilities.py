@@ -0,0 +1,182 @@
+from math import inf, pi, sin, cos, isnan
+
+import numpy
+import pytest
+
+from Classes.Interval import Interval
+from Scripts.ParseUtilities import parse_equation
+from Scripts.GraphUtilities import eval_dict
+from Scripts.IntervalUtilities import interval_dict, evaluate_interval
+from Scripts.ExplicitUtilities import adaptive_samples, clip_strokes, explicit_strokes
+from Scripts.NumberUtilities import nice_ticks, tick_labels
+
+
+@pytest.mark.parametrize("equation, expected", [
+    # Constants are folded
+    ("y = 2(3 + 4)", ("(y)", "14.0")),
+    ("y = 2*3x", ("(y)", "6.0 * (x)")),
+    ("y = sin(pi/2)x", ("(y)", "(x)")),
+    ("y = x*1 + 0", ("(y)", "(x)")),
+    ("y = 1/0", ("(y)", "1.0 / 0.0")),  # Left for the backends to handle
+    # Implicit multiplication
+    ("y = 2x", ("(y)", "2.0 * (x)")),
+    ("xy = 1", ("(x) * (y)", "1.0")),
+    ("y = x(x+1)", ("(y)", "(x) * ((x) + 1.0)")),
+    ("y = sinx^2 + 1", ("(y)", "(sin((x)) ** 2.0) + 1.0")),
+    # Repeated parts are computed once
+    ("y = sin(x)+sin(x)", ("(y)", "(_s0 := sin((x))) + _s0")),
+])
+def test_parse_equation(equation: str, expected: tuple[str, str]):
+    assert parse_equation(equation) == expected
+
+
+def test_parse_equation_variables():
+    assert parse_equation("y = $m x + $n", 3, 4) == ("(y)", "(3.0 * (x)) + 4.0")
+
+
+@pytest.mark.parametrize("equation, error", [
+    ("y = foo", NameError),
+    ("y = x +", SyntaxError),
+    ("y = x # 2", SyntaxError),
+    ("y = (x", SyntaxError),
+    ("y = 2.5.3x", SyntaxError),  # Not 2.5 * 0.3x
+    ("y = 2..3", SyntaxError),
+    (f"y = {'9' * 400}x", SyntaxError),  # Too large for a float
+])
+def test_parse_equation_invalid(equation: str, error: type):
+    with pytest.raises(error):
+        parse_equation(equation)
+
+
+@pytest.mark.parametrize("equation, expected", [
+    ("sin(x)+sin(x) = cos(y)cos(y)", lambda x, y: 2 * sin(x) - cos(y) ** 2),
+    ("sin(x)sin(x) = sin(x) + cos(y)cos(y)", lambda x, y: sin(x) ** 2 - (sin(x) + cos(y) ** 2)),
+])
+def test_shared_names_across_sides(equation: str, expected):
+    """
+    Both sides name their repeats _s0, _s1..., they must still be right once joined into lhs - (rhs)
+    """
+    lhs, rhs = parse_equation(equation)
+    assert "_s0 :=" in lhs and "_s0 :=" in rhs
+    for x, y in ((0.3, 1.2), (-2.0, 0.5)):
+        assert eval(f"{lhs} - ({rhs})", dict(eval_dict, x=x, y=y)) == pytest.approx(expected(x, y))
+
+
+def interval_bounds(interval: Interval) -> list[float]:
+    return [float(interval.lo), float(interval.hi)]
+
+
+@pytest.mark.parametrize("result, expected", [
+    (lambda: Interval(1, 2) + Interval(-3, 4), [-2, 6]),
+    (lambda: Interval(1, 2) - Interval(-3, 4), [-3, 5]),
+    (lambda: 1 - Interval(1, 2), [-1, 0]),
+    (lambda: Interval(1, 2) * Interval(-3, 4), [-6, 8]),
+    (lambda: -Interval(1, 2), [-2, -1]),
+    (lambda: Interval(1, 2) / Interval(4, 8), [0.125, 0.5]),
+    (lambda: Interval(1, 2) / Interval(-1, 1), [-inf, inf]),  # Division by zero somewhere in the cell
+    (lambda: Interval(-2, 1) ** 2, [0, 4]),
+    (lambda: Interval(-2, 1) ** 3, [-8, 1]),
+    (lambda: Interval(2, 4) ** -1, [0.25, 0.5]),
+    (lambda: Interval(4, 9) ** 0.5, [2, 3]),
+])
+def test_interval_arithmetic(result, expected: list[float]):
+    assert interval_bounds(result()) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("function, argument, expected", [
+    ("sin", (0, pi), [0, 1]),
+    ("sin", (pi, 2 * pi), [-1, 0]),
+    ("cos", (-0.5, 0.5), [cos(0.5), 1]),
+    ("tan", (0, 1), [0, 1.5574077246549023]),
+    ("tan", (1, 2), [-inf, inf]),  # Across the asymptote at pi/2
+    ("sqrt", (-4, 9), [0, 3]),
+    ("fabs", (-3, 2), [0, 3]),
+    ("log10", (1, 100), [0, 2]),
+    ("acos", (0, 1), [0, pi / 2]),
+    ("gamma_shift", (0, 3), [0.8856031944108887, 6]),  # Through the minimum of gamma
+])
+def test_interval_functions(function: str, argument: tuple[float, float], expected: list[float]):
+    assert interval_bounds(interval_dict[function](Interval(*argument))) == pytest.approx(expected)
+
+
+def test_interval_undefined():
+    bounds: Interval = interval_dict["sqrt"](Interval(-4, -1))
+    assert isnan(bounds.lo) and isnan(bounds.hi)
+
+
+def test_evaluate_interval():
+    bounds: Interval = evaluate_interval("(x) ** 2.0 + (y) ** 2.0", x=Interval([-1, 1], [1, 2]), y=Interval(2, 3))
+    assert bounds.lo.tolist() == [4, 5] and bounds.hi.tolist() == [10, 13]
+
+
+@pytest.mark.parametrize("values, expected_vertices, expected_starts", [
+    # Leaves through the top and comes back, cut where it crosses
+    ([0, 2, 0], [[0, 0], [0.5, 1], [1.5, 1], [2, 0]], [0, 2]),
+    # Broken where it is undefined
+    ([0, 0.5, numpy.nan, 0.5], [[0, 0], [1, 0.5]], [0]),
+    # Wholly inside
+    ([0, 0.5, -0.5], [[0, 0], [1, 0.5], [2, -0.5]], [0]),
+    # Wholly outside
+    ([5, 5, 6], numpy.empty((0, 2)), []),
+])
+def test_clip_strokes(values: list[float], expected_vertices, expected_starts: list[int]):
+    vertices, starts = clip_strokes(numpy.arange(len(values), dtype=float), numpy.array(values, dtype=float), (-1, 1))
+    numpy.testing.assert_allclose(vertices, numpy.asarray(expected_vertices, dtype=float).reshape(-1, 2))
+    assert starts == expected_starts
+
+
+
+def test_adaptive_samples_oscillating():
+    """
+    Oscillating faster than the pixels is drawn as a band, never broken as if it were an asymptote
+    """
+    samples, values = adaptive_samples("sin(1000.0 * (x))", 'x', (-10, 10), 400, (-10, 10), 400)
+    assert not numpy.isnan(values).any()
+    assert (numpy.diff(samples) >= 0).all()
+
+
+@pytest.mark.parametrize("equation, expected_strokes", [
+    (("(y)", "(x) ** 2.0"), 1),
+    (("(x)", "(y) ** 2.0"), 1),
+    (("(y)", "1.0 / (x)"), 2),
+    (("(y)", "tan((x))"), 7),  # Broken at the six asymptotes within the graph
+])
+def test_explicit_strokes(equation: tuple[str, str], expected_strokes: int):
+    vertices, starts = explicit_strokes(equation, (-10, 10), (-10, 10), (400, 400))
+    assert len(starts) == expected_strokes
+    assert ((-10 <= vertices) & (vertices <= 10)).all()
+
+
+def test_tan_strokes_stop_at_asymptotes():
+    vertices, starts = explicit_strokes(("(y)", "tan((x))"), (-10, 10), (-10, 10), (400, 400))
+    for start, end in zip(starts, starts[1:] + [len(vertices)]):
+        # No stroke crosses an odd multiple of pi/2
+        assert len(set(numpy.floor(vertices[start:end, 0] / pi + 0.5).tolist())) == 1
+
+
+def test_domain_edge_is_refined():
+    vertices, starts = explicit_strokes(("(y)", "sqrt((x))"), (-10, 10), (-10, 10), (400, 400))
+    assert starts == [0] and vertices[0, 0] == pytest.approx(0, abs=0.01)  # Within a fifth of a pixel
+
+
+@pytest.mark.parametrize("bounds, max_ticks, expected_ticks, expected_exponent", [
+    ((0, 1), 5, [0, 0.2, 0.4, 0.6, 0.8, 1], -1),
+    ((-10, 10), 4, [-10, -5, 0, 5, 10], 0),
+    ((-3E5, 1E5), 4, [-3E5, -2E5, -1E5, 0, 1E5], 5),
+    ((5, 5), 10, [], 0),
+])
+def test_nice_ticks(bounds: tuple[float, float], max_ticks: int, expected_ticks: list[float], expected_exponent: int):
+    ticks, exponent = nice_ticks(bounds, max_ticks)
+    assert ticks == pytest.approx(expected_ticks) and exponent == expected_exponent
+
+
+@pytest.mark.parametrize("ticks, exponent, expected", [
+    ([0, 0.2, 0.4, 0.6, 0.8, 1], -1, ['0', "0.2", "0.4", "0.6", "0.8", "1.0"]),
+    ([-10, -5, 0, 5, 10], 0, ["-10", "-5", '0', '5', "10"]),
+    # Every label of an axis has the notation and digits of the largest
+    ([-3E5, -2.8E5, -2E4, 0, 2E4, 1E5], 4, ["-3.0E5", "-2.8E5", "-2.0E4", '0', "2.0E4", "1.0E5"]),
+    ([-0.01, -0.005, 0, 0.005, 0.01], -3, ["-1.0E-2", "-5.0E-3", '0', "5.0E-3", "1.0E-2"]),
+    ([1E6, 1E6 + 5E-5, 1E6 + 1E-4], -5, ["1.00000000000E6", "1.00000000005E6", "1.00000000010E6"]),
+])
+def test_tick_labels(ticks: list[float], exponent: int, expected: list[str]):
+    assert tick_labels(ticks, exponent) == expected
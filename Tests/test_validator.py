@@ -0,0 +1,69 @@
+from time import perf_counter, sleep
+
+import pytest
+
+from Classes.Validator import Validator, TIMED_OUT
+from Scripts.GraphUtilities import check_equation
+
+
+@pytest.fixture(scope="module")
+def validator():
+    validator: Validator = Validator(delay=0)
+    yield validator
+    validator.close()
+
+
+def checked(validator: Validator, text: str, m: float = 0, n: float = 0) -> tuple:
+    """
+    Checks a text on the worker, polling until its result arrives
+    """
+    deadline: float = perf_counter() + 30
+    while (result := validator.check(0, text, m, n, wait=False)) is None:
+        assert perf_counter() < deadline
+        validator.poll()
+        sleep(0.01)
+    return result
+
+
+@pytest.mark.parametrize("equation, expected", [
+    ("m = 2", (None, 10, 2.0)),
+    ("n = 3/4", (None, 11, 0.75)),
+    ("m = foo", (None, 10, None)),  # Couldn't be evaluated, $m is kept
+    # Only real numbers can be assigned
+    ("m = [1]", (None, 5, None)),
+    ("n = 1j", (None, 5, None)),
+    ("m = True", (None, 5, None)),
+    ("m = 10**400", (None, 5, None)),
+    ("y = x", (("(y)", "(x)"), 0, None)),
+    ("y = z", (None, 3, None)),
+    ("y = 1/0", (None, 2, None)),
+])
+def test_check_equation(equation: str, expected: tuple):
+    assert check_equation(equation, 0, 0) == expected
+
+
+def test_assigned_value_is_float():
+    assert type(check_equation("m = 2", 0, 0)[2]) is float
+
+
+def test_validator_result(validator: Validator):
+    assert checked(validator, "y = x^2") == (("(y)", "(x) ** 2.0"), 0, None)
+    assert checked(validator, "m = 4") == (None, 10, 4.0)
+
+
+def test_validator_survives_errors(validator: Validator):
+    """
+    Anything the check raises on the worker is an invalid equation, not an error in the main loop
+    """
+    assert checked(validator, "m = [][1]") == (None, 4, None)
+    assert checked(validator, "y = 2x") == (("(y)", "2.0 * (x)"), 0, None)
+
+
+def test_validator_timeout():
+    validator: Validator = Validator(delay=0, timeout=0.2)
+    try:
+        checked(validator, "y = x")  # Warms up the worker, which is never timed out
+        assert checked(validator, "m = 9**9**9") == (None, TIMED_OUT, None)
+        assert checked(validator, "y = x") == (("(y)", "(x)"), 0, None)
+    finally:
+        validator.close()
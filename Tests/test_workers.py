@@ -0,0 +1,93 @@
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy
+import pytest
+
+from Scripts import WorkerUtilities
+from Scripts.WorkerUtilities import CANCELLED, block_names, free_block, free_blocks, share_polylines, read_polylines, \
+    share_lattice, read_lattice, new_tokens, tile_chunk, render_chunk, render_explicit
+
+
+@pytest.fixture
+def name():
+    name: str = block_names(0, 1)[0]
+    yield name
+    free_blocks([name])
+
+
+def test_polylines_round_trip(name: str):
+    polylines: list = [[(0.0, 1.0), (2.0, 3.0), (4.0, 5.0)], [(-1.5, 0.5), (0.0, 0.0)]]
+    handle: tuple = share_polylines(polylines, name + 'p')
+    vertices, lengths = read_polylines(handle)
+    numpy.testing.assert_array_equal(vertices, [point for polyline in polylines for point in polyline])
+    assert lengths.tolist() == [3, 2]
+    with pytest.raises(FileNotFoundError):  # Freed once read
+        SharedMemory(name=name + 'p')
+
+
+def test_no_polylines(name: str):
+    assert share_polylines([], name + 'p') is None
+    vertices, lengths = read_polylines(None)
+    assert vertices.shape == (0, 2) and lengths.shape == (0,)
+
+
+def test_lattice_round_trip(name: str):
+    values: numpy.ndarray = numpy.arange(12, dtype=float).reshape(3, 4)
+    values[1, 2] = numpy.nan
+    handle: tuple = share_lattice(values, name + 'l')
+    numpy.testing.assert_array_equal(read_lattice(handle), values)
+    numpy.testing.assert_array_equal(read_lattice(handle), values)  # Kept until it is freed
+    free_block(name + 'l')
+    assert read_lattice(handle) is None
+
+
+def test_free_blocks_of_a_pass():
+    names: list[str] = block_names(1, 3)
+    assert len(set(names)) == 3 and set(names).isdisjoint(block_names(2, 3))
+    for name in names:
+        share_polylines([[(0.0, 0.0), (1.0, 1.0)]], name + 'p')
+        share_lattice(numpy.zeros((2, 2)), name + 'l')
+    free_blocks(names + block_names(3, 1))  # Blocks that were never written are skipped
+    for name in names:
+        for suffix in "pl":
+            with pytest.raises(FileNotFoundError):
+                SharedMemory(name=name + suffix)
+
+
+CIRCLE: tuple[str, str] = ("(x) ** 2.0 + (y) ** 2.0", "1.0")
+
+
+@pytest.fixture
+def tokens(monkeypatch):
+    tokens = new_tokens()
+    monkeypatch.setattr(WorkerUtilities, "tokens", tokens)
+    return tokens
+
+
+def test_new_tokens_are_cancelled(tokens):
+    assert set(tokens) == {CANCELLED}
+
+
+def test_cancelled_tile_is_skipped(tokens, name: str):
+    tokens[5] = 2
+    for token in ((5, 1), (5, CANCELLED), (6, 2)):  # Superseded, cancelled, or another slot's generation
+        assert render_chunk(tile_chunk(CIRCLE, (0.025, 0.025, 64), (0, 0), 1, None, token, name)) is None
+    with pytest.raises(FileNotFoundError):  # Nothing was written
+        SharedMemory(name=name + 'p')
+
+
+def test_current_tile_is_rendered(tokens, name: str):
+    tokens[5] = 2
+    polylines, lattice = render_chunk(tile_chunk(CIRCLE, (0.025, 0.025, 64), (0, 0), 8, None, (5, 2), name))
+    vertices, lengths = read_polylines(polylines)
+    assert len(lengths) == 1 and len(vertices) > 2
+    assert read_lattice(lattice).shape == (9, 9)
+
+
+def test_cancelled_explicit_is_skipped(tokens):
+    job: tuple = (("(y)", "(x)"), (-1, 1), (-1, 1), (100, 100))
+    tokens[0] = 3
+    assert render_explicit(job + ((0, 2),)) is None
+    vertices, starts = render_explicit(job + ((0, 3),))
+    assert starts == [0] and len(vertices) >= 2
+    assert render_explicit(job + (None,)) is not None  # Untracked jobs always run